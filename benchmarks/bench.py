@@ -0,0 +1,222 @@
+"""
+Offline benchmark suite for the bot's hot paths.
+
+Runs against a local fake Torn API and synthetic guilds, so it needs no network or credentials:
+
+    python benchmarks/bench.py --output results.json
+    python benchmarks/bench.py --quick
+
+Measures:
+- faction_sync: wall time, API calls and role edits of one full role sync pass, per guild size and sync mode
+- chain_processing: process_chain_data throughput on a large chain log, full and incremental
+- nickname_checks: nickname index build time and check_duplicate_nickname / check_duplicate_torn_id cost
+- chain_persistence: click-path latency and disk writes of chain participant persistence under click bursts
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_torn import FakeTornServer, build_chain_log
+from harness import import_bot, latency_summary, metadata, write_results
+from synthetic import build_guild, linked_torn_ids
+
+
+async def bench_faction_sync(main, server: FakeTornServer, sizes, modes, keys, profile_max_size):
+    results = []
+    for size in sizes:
+        for mode in modes:
+            if mode == "profile" and profile_max_size and size > profile_max_size:
+                continue  # one request per member, too slow to be worth it at this size
+            guild = build_guild(size)
+            server.population = linked_torn_ids(guild)
+            main.FACTION_SYNC_MODE = mode
+            main.bot.faction_index = None
+            await main.bot.torn.close()
+            main.bot.torn = main.TornAPIClient([f"benchkey{i:02d}" for i in range(keys)], base_url=server.url)
+
+            # The cold pass fixes every wrong role; the warm one shows the steady state (caches filled, nothing to edit)
+            for run in ("cold", "warm"):
+                server.reset_counts()
+                edits_before = guild.edits
+                started = time.perf_counter()
+                report = await main.run_faction_role_sync([guild])
+                wall_time = time.perf_counter() - started
+                results.append({
+                    "members": size,
+                    "mode": mode,
+                    "run": run,
+                    "wall_time_s": round(wall_time, 4),
+                    "api_calls": dict(server.calls),
+                    "api_errors": server.errors,
+                    "role_edits": guild.edits - edits_before,
+                    "checked": report.checked if report else None,
+                    "planned": report.planned if report else None,
+                    "failed": report.failed if report else None,
+                })
+    return results
+
+
+def bench_chain_processing(main, hits: int, repeats: int, new_hits: int = 100):
+    start = int(time.time()) - hits
+    log = build_chain_log(hits, start)
+    chain_data = {"current": hits, "start": start, "log": log}
+
+    full_times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        main.process_chain_data(chain_data)
+        full_times.append(time.perf_counter() - started)
+
+    # A poll that brings `new_hits` hits, as the chain feed sees it: once with the whole log, once filtered by `from`
+    split = hits - new_hits
+    older = dict(list(log.items())[:split])
+    newer = dict(list(log.items())[split:])
+    incremental = {}
+    for payload_name, payload_log in (("full_log", log), ("from_filtered", newer)):
+        times = []
+        for _ in range(repeats):
+            aggregator = main.ChainAggregator()
+            aggregator.fold({"current": split, "start": start, "log": older})
+            started = time.perf_counter()
+            aggregator.fold({"current": hits, "start": start, "log": payload_log})
+            times.append(time.perf_counter() - started)
+        incremental[payload_name] = {"best_ms": round(min(times) * 1000, 3)}
+
+    best = min(full_times)
+    return {
+        "hits": hits,
+        "full_best_ms": round(best * 1000, 3),
+        "full_hits_per_s": round(hits / best),
+        "incremental_new_hits": new_hits,
+        "incremental": incremental,
+    }
+
+
+def bench_nickname_checks(main, sizes, lookups: int):
+    results = []
+    rng = random.Random(1)
+    for size in sizes:
+        guild = build_guild(size)
+        main.bot.nickname_indexes.clear()
+        started = time.perf_counter()
+        main.get_nickname_index(guild)
+        build_time = time.perf_counter() - started
+
+        members = [member for member in guild.members if member.nick]
+        name_checks, torn_id_checks = [], []
+        for i in range(lookups):
+            member = rng.choice(members)
+            # Half the checks hit an existing nickname, half are new names
+            name = member.nick if i % 2 == 0 else f"newcomer{i} [{900_000 + i}]"
+            started = time.perf_counter()
+            main.check_duplicate_nickname(guild, name, current_user_id=0)
+            name_checks.append(time.perf_counter() - started)
+
+            torn_id = main.parse_torn_id(name)
+            started = time.perf_counter()
+            main.check_duplicate_torn_id(guild, torn_id, current_user_id=0)
+            torn_id_checks.append(time.perf_counter() - started)
+
+        results.append({
+            "members": size,
+            "index_build_ms": round(build_time * 1000, 3),
+            "check_duplicate_nickname": latency_summary(name_checks),
+            "check_duplicate_torn_id": latency_summary(torn_id_checks),
+        })
+    return results
+
+
+async def bench_chain_persistence(main, workdir: str, clicks: int, chains: int, unbuffered_clicks: int):
+    """
+    Replays `clicks` button clicks spread over one second and `chains` chains, with members
+    changing their minds, against the write-behind buffer in front of the SQLite chain store.
+    """
+    rng = random.Random(1)
+    members = max(clicks // 2, 1)  # so some members click more than once
+    burst = [(1000 + rng.randrange(chains), rng.randrange(members), rng.random() < 0.7) for _ in range(clicks)]
+
+    store = main.ChainStore(os.path.join(workdir, "persistence.db"))
+    writer = main.ChainWriteBehind(store)
+    click_times = []
+    for i, (message_id, user_id, is_joining) in enumerate(burst):
+        started = time.perf_counter()
+        writer.set_participant(message_id, user_id, f"member{user_id}", is_joining)
+        click_times.append(time.perf_counter() - started)
+        if i % 10 == 9:
+            await asyncio.sleep(10 / clicks)  # spread the burst over about a second
+
+    started = time.perf_counter()
+    await writer.close()
+    drain_time = time.perf_counter() - started
+
+    # Baseline: one transaction per click, as a write-on-every-click design would do
+    unbuffered_times = []
+    for message_id, user_id, is_joining in burst[:unbuffered_clicks]:
+        started = time.perf_counter()
+        await store.set_participants([(message_id, user_id, f"member{user_id}", is_joining)])
+        unbuffered_times.append(time.perf_counter() - started)
+    await store.close()
+
+    return {
+        "clicks": clicks,
+        "chains": chains,
+        "click_path": latency_summary(click_times),
+        "final_flush_ms": round(drain_time * 1000, 3),
+        "writes_requested": writer.requested_writes,
+        "rows_written": writer.flushed_rows,
+        "transactions": writer.flushes,
+        "coalesced_writes": writer.coalesced_writes,
+        "unbuffered_write_per_click": latency_summary(unbuffered_times),
+    }
+
+
+async def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="chainbot-bench-")
+    main = import_bot(workdir, api_keys=args.keys)
+    server = FakeTornServer(latency=args.latency, error_rate=args.error_rate)
+    await server.start()
+    try:
+        results = {
+            "faction_sync": await bench_faction_sync(main, server, args.sizes, args.modes, args.keys, args.profile_max_size),
+            "chain_processing": bench_chain_processing(main, args.chain_hits, args.repeats),
+            "nickname_checks": bench_nickname_checks(main, args.sizes, args.lookups),
+            "chain_persistence": await bench_chain_persistence(main, workdir, args.clicks, args.chains, args.unbuffered_clicks),
+        }
+    finally:
+        await main.bot.torn.close()
+        await server.stop()
+    return {"meta": metadata(vars(args)), "results": results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the chain bot.")
+    int_list = lambda text: [int(value) for value in text.split(",") if value]
+    parser.add_argument("--sizes", type=int_list, default=[1000, 10000, 50000], help="synthetic guild sizes")
+    parser.add_argument("--modes", type=lambda text: text.split(","), default=["roster", "profile"], help="faction sync modes")
+    parser.add_argument("--profile-max-size", type=int, default=10000, help="largest guild to sync in profile mode (0: no limit)")
+    parser.add_argument("--keys", type=int, default=10, help="fake Torn API keys in the pool")
+    parser.add_argument("--latency", type=float, default=0.005, help="fake Torn API latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake Torn API requests that fail")
+    parser.add_argument("--chain-hits", type=int, default=10000, help="hits in the synthetic chain log")
+    parser.add_argument("--repeats", type=int, default=5, help="repetitions of the CPU-bound measurements")
+    parser.add_argument("--lookups", type=int, default=1000, help="duplicate checks per guild size")
+    parser.add_argument("--clicks", type=int, default=1000, help="button clicks in the persistence burst")
+    parser.add_argument("--chains", type=int, default=10, help="concurrent chains the clicks are spread over")
+    parser.add_argument("--unbuffered-clicks", type=int, default=200, help="clicks replayed with one transaction each")
+    parser.add_argument("--quick", action="store_true", help="small sizes for a fast smoke run")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sizes, args.chain_hits, args.clicks, args.unbuffered_clicks, args.repeats = [1000], 2000, 200, 50, 2
+    return args
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    write_results(asyncio.run(run(arguments)), arguments.output)
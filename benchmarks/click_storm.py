@@ -0,0 +1,188 @@
+"""
+Load test for chain button click storms, the burst that follows a war announcement.
+
+Drives ChainButton.callback and CancelButton.callback with fake interactions: hundreds of
+members clicking within about a second across many concurrent chains, with some organizers
+cancelling mid-storm. Reports time to ack, persistence writes and message edits, then checks
+that every chain's in-memory and persisted participants match the clicks that were processed.
+
+    python benchmarks/click_storm.py --chains 20 --members 500 --clicks 3000 --output storm.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import import_bot, latency_summary, metadata, write_results
+from synthetic import FakeInteraction, FakeRole, FakeTextChannel, FakeUser
+
+ORGANIZER = "organizer"
+
+
+async def setup_chains(main, count: int):
+    """Registers `count` active chains, each with its own channel and sign-up message."""
+    bot = main.bot
+    channels = {}
+    bot.get_channel = channels.get  # the bot looks chain channels up by ID
+    end_time = datetime.now(timezone.utc) + timedelta(hours=1)
+    chains = {}
+    for i in range(count):
+        channel = FakeTextChannel(500_000 + i)
+        message = channel.add_message(900_000 + i)
+        channels[channel.id] = channel
+        view = main.ChainView(bot, {"organizer": ORGANIZER})
+        chain_info = {
+            "message_id": message.id,
+            "end_time_utc": end_time,
+            "timestamp": int(end_time.timestamp()),
+            "organizer": ORGANIZER,
+            "view": view,
+        }
+        bot.active_chains[channel.id] = chain_info
+        await bot.chain_store.save_chain(channel.id, chain_info)
+        chains[channel.id] = (channel, message, view)
+    return chains
+
+
+def plan_storm(chain_ids, members: int, clicks: int, duration: float, cancel_ratio: float, seed: int):
+    """Returns the click schedule as (offset, channel_id, user_id, action) sorted by offset."""
+    rng = random.Random(seed)
+    schedule = [(rng.uniform(0, duration), rng.choice(chain_ids), rng.randrange(members),
+                 "join" if rng.random() < 0.7 else "skip") for _ in range(clicks)]
+    for channel_id in rng.sample(chain_ids, round(len(chain_ids) * cancel_ratio)):
+        schedule.append((rng.uniform(duration * 0.25, duration * 0.75), channel_id, -1, "cancel"))
+    return sorted(schedule)
+
+
+async def run_storm(main, args) -> dict:
+    bot = main.bot
+    chains = await setup_chains(main, args.chains)
+    schedule = plan_storm(list(chains), args.members, args.clicks, args.duration, args.cancel_ratio, args.seed)
+    users = {user_id: FakeUser(1_000_000 + user_id, f"member{user_id}") for user_id in range(args.members)}
+    organizer = FakeUser(42, ORGANIZER, roles=[FakeRole(1, "Admin")])
+
+    processed = []  # (channel_id, user, action, chain still active), in the order the callbacks ran
+    interactions = {"join": [], "skip": [], "cancel": []}
+
+    async def click(offset: float, channel_id: int, user_id: int, action: str):
+        await asyncio.sleep(offset)
+        channel, message, view = chains[channel_id]
+        user = organizer if action == "cancel" else users[user_id]
+        interaction = FakeInteraction(user, channel, message, ack_latency=args.ack_latency)
+        interactions[action].append(interaction)
+        # State changes happen before the callback's first await, so this is the order they were applied in
+        processed.append((channel_id, user, action, channel_id in bot.active_chains))
+        button = {"join": view.join_button, "skip": view.skip_button, "cancel": view.cancel_button}[action]
+        await button.callback(interaction)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(click(*entry) for entry in schedule))
+    storm_time = time.perf_counter() - started
+
+    # Let the debounced message updates and the write-behind flush finish
+    await asyncio.sleep(main.CHAIN_UPDATE_DEBOUNCE + 0.5)
+    await bot.chain_writer.flush()
+    while bot.edit_dispatcher.stats()["queue_depth"] or bot.edit_dispatcher.stats()["in_flight"]:
+        await asyncio.sleep(0.05)
+
+    all_acks = [interaction.ack_time for kind in interactions.values() for interaction in kind]
+    writer = bot.chain_writer
+    return {
+        "storm_time_s": round(storm_time, 3),
+        "interactions": len(all_acks),
+        "interactions_per_s": round(len(all_acks) / storm_time),
+        "ack": latency_summary([ack for ack in all_acks if ack is not None]),
+        "ack_by_button": {kind: latency_summary([i.ack_time for i in kinds if i.ack_time is not None])
+                          for kind, kinds in interactions.items()},
+        "unacked": sum(ack is None for ack in all_acks),
+        "persistence": {
+            "writes_requested": writer.requested_writes,
+            "rows_written": writer.flushed_rows,
+            "transactions": writer.flushes,
+            "coalesced_writes": writer.coalesced_writes,
+            "discarded_rows": writer.discarded_rows,
+        },
+        "message_edits": sum(message.edits for _, message, _ in chains.values()),
+        "edit_dispatcher": bot.edit_dispatcher.stats(),
+        "consistency": await check_consistency(main, chains, processed),
+    }
+
+
+async def check_consistency(main, chains, processed) -> dict:
+    """Replays the processed clicks and compares the result with the views and the chain store."""
+    expected_view = {channel_id: {} for channel_id in chains}
+    expected_stored = {channel_id: {} for channel_id in chains}
+    cancelled = set()
+    for channel_id, user, action, was_active in processed:
+        if action == "cancel":
+            if was_active:
+                cancelled.add(channel_id)
+            continue
+        expected_view[channel_id][user.id] = action == "join"
+        if was_active:
+            expected_stored[channel_id][user.id] = action == "join"
+
+    stored = await main.bot.chain_store.load_chains()
+    db = sqlite3.connect(main.bot.chain_store.path)
+    mismatches = []
+    for channel_id, (_, message, view) in chains.items():
+        actual_view = {user_id: True for user_id, _ in view.joiners}
+        actual_view.update({user_id: False for user_id, _ in view.cant_make_it})
+        if actual_view != expected_view[channel_id]:
+            mismatches.append(f"channel {channel_id}: view differs from the processed clicks")
+        if len(view.joiners) + len(view.cant_make_it) != len(actual_view):
+            mismatches.append(f"channel {channel_id}: a member is listed as both joining and not joining")
+
+        if channel_id in cancelled:
+            orphans = db.execute("SELECT COUNT(*) FROM participants WHERE message_id = ?", (message.id,)).fetchone()[0]
+            if channel_id in stored or channel_id in main.bot.active_chains or orphans:
+                mismatches.append(f"channel {channel_id}: cancelled chain still persisted ({orphans} participant rows)")
+            continue
+
+        chain = stored.get(channel_id)
+        actual_stored = {user_id: True for user_id, _ in chain["joiners"]} if chain else {}
+        if chain:
+            actual_stored.update({user_id: False for user_id, _ in chain["cant_make_it"]})
+        if actual_stored != expected_stored[channel_id]:
+            mismatches.append(f"channel {channel_id}: stored participants differ from the processed clicks")
+    db.close()
+    return {"ok": not mismatches, "cancelled_chains": len(cancelled), "mismatches": mismatches[:20]}
+
+
+async def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="chainbot-storm-")
+    main = import_bot(workdir)
+    try:
+        results = await run_storm(main, args)
+    finally:
+        await main.bot.edit_dispatcher.close()
+        await main.bot.chain_writer.close()
+        await main.bot.chain_store.close()
+    return {"meta": metadata(vars(args)), "results": results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for chain button click storms.")
+    parser.add_argument("--chains", type=int, default=20, help="concurrent chains")
+    parser.add_argument("--members", type=int, default=500, help="distinct members clicking")
+    parser.add_argument("--clicks", type=int, default=3000, help="join / can't make it clicks in the storm")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds the clicks are spread over")
+    parser.add_argument("--cancel-ratio", type=float, default=0.1, help="share of chains cancelled mid-storm")
+    parser.add_argument("--ack-latency", type=float, default=0.0, help="simulated Discord round trip of an ack")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    results = asyncio.run(run(arguments))
+    write_results(results, arguments.output)
+    sys.exit(0 if results["results"]["consistency"]["ok"] else 1)
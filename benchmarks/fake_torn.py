@@ -0,0 +1,122 @@
+"""
+Local stand-in for api.torn.com, so benchmarks run without network access or API keys.
+Serves the selections the bot uses (user profile, faction basic / chain / rankedwars)
+with configurable latency and error rate, and counts every request it answers.
+"""
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+FACTION_IDS = (53180, 55332)  # the factions the bot maps to roles
+BACKEND_ERROR = {"code": 17, "error": "Backend error occurred, please try again."}  # not a key error, so no key gets parked
+
+
+def faction_of(torn_id: int) -> int:
+    """Deterministic faction assignment: a third in each tracked faction, a third factionless."""
+    return (FACTION_IDS + (0,))[torn_id % 3]
+
+
+def build_chain_log(hits: int, start: int, attackers: int = 500, seed: int = 1) -> Dict[str, Dict]:
+    """Builds a chain log of `hits` attacks, one per second from `start`, by `attackers` distinct members."""
+    rng = random.Random(seed)
+    results = ("Attacked", "Mugged", "Hospitalized", "Left")
+    log = {}
+    for i in range(hits):
+        attacker = rng.randrange(attackers)
+        log[str(1_000_000 + i)] = {
+            "initiator_id": 2_000_000 + attacker,
+            "initiator_name": f"attacker{attacker}",
+            "result": rng.choice(results),
+            "respect_gain": round(rng.uniform(1, 10), 2),
+            "timestamp_started": start + i - 3,
+            "timestamp_ended": start + i,
+        }
+    return log
+
+
+class FakeTornServer:
+    """
+    aiohttp application answering /user/{id} and /faction/{id} like the Torn v1 API.
+    `population` is the set of Torn IDs that exist; faction rosters are derived from it.
+    """
+    def __init__(self, population: Optional[List[int]] = None, latency: float = 0.0, error_rate: float = 0.0,
+                 chain_hits: int = 0, seed: int = 1):
+        self.population = population or []
+        self.latency = latency
+        self.error_rate = error_rate
+        self.chain_start = int(time.time()) - chain_hits
+        self.chain_log = build_chain_log(chain_hits, self.chain_start, seed=seed) if chain_hits else {}
+        self.calls: Counter = Counter()
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def reset_counts(self):
+        self.calls.clear()
+        self.errors = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/user/{entity_id}", self.handle_user)
+        app.router.add_get("/faction/{entity_id}", self.handle_faction)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]  # the port the OS picked when port is 0
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _respond(self, selection: str, payload) -> web.Response:
+        self.calls[selection] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": BACKEND_ERROR})
+        return web.json_response(payload() if callable(payload) else payload)
+
+    async def handle_user(self, request: web.Request) -> web.Response:
+        torn_id = int(request.match_info["entity_id"])
+        faction_id = faction_of(torn_id)
+        return await self._respond("profile", lambda: {
+            "player_id": torn_id,
+            "name": f"player{torn_id}",
+            "faction": {"faction_id": faction_id, "faction_name": f"Faction {faction_id}" if faction_id else "None"},
+        })
+
+    async def handle_faction(self, request: web.Request) -> web.Response:
+        faction_id = int(request.match_info["entity_id"])
+        selection = request.query.get("selections", "basic")
+        if selection == "basic":
+            return await self._respond("basic", lambda: {
+                "ID": faction_id,
+                "name": f"Faction {faction_id}",
+                "members": {str(torn_id): {"name": f"player{torn_id}"} for torn_id in self.population
+                            if faction_of(torn_id) == faction_id},
+            })
+        if selection == "chain":
+            since = int(request.query.get("from", 0))
+            return await self._respond("chain", lambda: {"chain": {
+                "current": len(self.chain_log),
+                "max": 10000,
+                "timeout": 240,
+                "start": self.chain_start,
+                "log": {hit_id: hit for hit_id, hit in self.chain_log.items() if hit["timestamp_ended"] >= since},
+            }})
+        if selection == "rankedwars":
+            now = int(time.time())
+            return await self._respond("rankedwars", {"rankedwars": {"9001": {
+                "factions": {str(faction_id): {"name": "Us", "score": 1200, "chain": 250},
+                             "1": {"name": "Them", "score": 950, "chain": 120}},
+                "war": {"start": now - 3600, "end": 0, "target": 3000, "winner": 0},
+            }}})
+        return web.json_response({"error": {"code": 4, "error": "Wrong fields"}})
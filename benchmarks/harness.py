@@ -0,0 +1,80 @@
+"""
+Shared plumbing for the benchmark scripts: importing main.py offline and reporting results.
+"""
+import contextlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_bot(workdir: str, api_keys: int = 1, log_level: int = logging.WARNING):
+    """
+    Imports main.py with placeholder credentials and every file it writes (log, chain store)
+    redirected into `workdir`. The Torn budget is lifted so the client's rate limiting
+    doesn't dominate measurements against the local fake API. The bot's console log goes to
+    stderr, so stdout carries nothing but the JSON results.
+    """
+    os.environ.setdefault("DISCORD_TOKEN", "benchmark-token")
+    os.environ["TORN_API_KEYS"] = ",".join(f"benchkey{i:02d}" for i in range(api_keys))
+    os.environ.setdefault("TORN_REQUESTS_PER_MINUTE", str(10 ** 9))
+    os.environ["LOG_FILE"] = os.path.join(workdir, "bench.log")
+    os.environ["CHAIN_DB_FILE"] = os.path.join(workdir, "chains.db")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    with contextlib.redirect_stdout(sys.stderr):  # main.py binds its console handler to sys.stdout on import
+        import main
+    logging.getLogger("discord").setLevel(log_level)
+    return main
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p99/max of a list of durations, in milliseconds."""
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        "count": len(seconds),
+        "p50_ms": to_ms(percentile(seconds, 50)),
+        "p99_ms": to_ms(percentile(seconds, 99)),
+        "max_ms": to_ms(max(seconds) if seconds else None),
+    }
+
+
+def metadata(parameters: Dict) -> Dict:
+    """Identifies the run, so results from different commits can be compared."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": int(time.time()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+    }
+
+
+def write_results(results: Dict, output: Optional[str]):
+    """Writes the results as JSON to `output`, or to stdout."""
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+        print(f"Results written to {output}", file=sys.stderr)
+    else:
+        print(text)
@@ -0,0 +1,171 @@
+"""
+Synthetic stand-ins for the discord.py objects the bot touches, so guild-sized workloads
+can be replayed without a gateway connection. Only the attributes main.py uses are modelled.
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import discord
+
+FACTION_ROLE_NAMES = ("faction -I-", "faction -II-")
+
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+
+    def is_default(self) -> bool:
+        return self.name == "@everyone"
+
+    def __repr__(self):
+        return f"<FakeRole {self.name}>"
+
+
+class FakeMember:
+    def __init__(self, member_id: int, name: str, nick: Optional[str] = None, bot: bool = False):
+        self.id = member_id
+        self.name = name
+        self.nick = nick
+        self.bot = bot
+        self.roles: List[FakeRole] = []
+        self.guild: Optional["FakeGuild"] = None
+        self.edits = 0
+
+    @property
+    def display_name(self) -> str:
+        return self.nick or self.name
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    async def edit(self, roles=None, nick=None, reason=None):
+        self.edits += 1
+        if roles is not None:
+            self.roles = list(roles)
+        if nick is not None:
+            self.nick = nick
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str = "Synthetic Guild"):
+        self.id = guild_id
+        self.name = name
+        self.default_role = FakeRole(guild_id, "@everyone")
+        self.roles = [self.default_role] + [FakeRole(guild_id + i + 1, name) for i, name in enumerate(FACTION_ROLE_NAMES)]
+        self.members: List[FakeMember] = []
+        self._members_by_id: Dict[int, FakeMember] = {}
+
+    def add_member(self, member: FakeMember):
+        member.guild = self
+        self.members.append(member)
+        self._members_by_id[member.id] = member
+
+    def get_member(self, member_id: int) -> Optional[FakeMember]:
+        return self._members_by_id.get(member_id)
+
+    @property
+    def edits(self) -> int:
+        return sum(member.edits for member in self.members)
+
+
+def build_guild(size: int, guild_id: int = 1, linked_ratio: float = 0.9, seed: int = 1) -> FakeGuild:
+    """
+    Builds a guild of `size` members. `linked_ratio` of them have a "name [torn_id]" nickname;
+    each holds a random faction role, so a sync pass has a realistic mix of no-ops and edits.
+    """
+    rng = random.Random(seed)
+    guild = FakeGuild(guild_id, name=f"guild-{size}")
+    faction_roles = guild.roles[1:]
+    for i in range(size):
+        torn_id = 100_000 + i
+        nick = f"player{torn_id} [{torn_id}]" if rng.random() < linked_ratio else None
+        member = FakeMember(guild_id * 10_000_000 + i, f"user{i}", nick=nick)
+        member.roles = [guild.default_role] + rng.sample(faction_roles, rng.randrange(len(faction_roles) + 1))
+        guild.add_member(member)
+    return guild
+
+
+def linked_torn_ids(guild: FakeGuild) -> List[int]:
+    """The Torn IDs claimed by the guild's nicknames."""
+    return [int(member.nick.rsplit("[", 1)[1][:-1]) for member in guild.members if member.nick]
+
+
+class FakeUser:
+    """The interaction author: what the chain buttons read from interaction.user."""
+    def __init__(self, user_id: int, name: str, roles: Optional[List[FakeRole]] = None):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.roles = roles or []
+
+
+class FakeMessage:
+    """A sent message that records the edits made to it."""
+    def __init__(self, message_id: int, channel: "FakeTextChannel"):
+        self.id = message_id
+        self.channel = channel
+        self.edits = 0
+
+    async def edit(self, **kwargs):
+        self.edits += 1
+
+
+class FakeTextChannel(discord.TextChannel):
+    """
+    Passes the bot's isinstance(channel, discord.TextChannel) checks; only get_partial_message
+    is modelled, and it hands out FakeMessage objects.
+    """
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.messages: Dict[int, FakeMessage] = {}
+
+    def add_message(self, message_id: int) -> FakeMessage:
+        message = self.messages[message_id] = FakeMessage(message_id, self)
+        return message
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return self.messages[message_id]
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction: "FakeInteraction", latency: float):
+        self.interaction = interaction
+        self.latency = latency
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content=None, **kwargs):
+        # The ack counts as sent when the bot issues it; the simulated round trip comes after
+        self.interaction.acked_at = time.perf_counter()
+        self._done = True
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def defer(self, **kwargs):
+        await self.send_message()
+
+    async def edit_message(self, **kwargs):
+        await self.send_message()
+
+
+class FakeInteraction:
+    """A button click, timestamped on creation so the time to ack can be measured."""
+    def __init__(self, user: FakeUser, channel: FakeTextChannel, message: FakeMessage, ack_latency: float = 0.0):
+        self.user = user
+        self.channel = channel
+        self.message = message
+        self.created_at = datetime.now(timezone.utc)  # what the bot's ack metrics read
+        self.created_at_perf = time.perf_counter()
+        self.acked_at: Optional[float] = None
+        self.response = FakeInteractionResponse(self, ack_latency)
+
+    @property
+    def ack_time(self) -> Optional[float]:
+        return self.acked_at - self.created_at_perf if self.acked_at is not None else None
@@ -2,41 +2,135 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
+import logging.handlers
+import queue
+import atexit
+import signal
 import sys
 from dotenv import load_dotenv
 import os
 import asyncio
 import datetime
 import re
+import time
+import threading
+import traceback
+import heapq
+import itertools
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Set, Tuple
+from typing import Optional, Dict, List, Set, Tuple
 from discord.ui import Button, View
 import aiohttp
+from aiohttp import web
 import json
+import hashlib
+import sqlite3
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),  # Log to stdout for CapRover
-        logging.FileHandler(filename="discord.log", encoding="utf-8", mode="a")  # Also keep file logging
-    ]
+LOG_FILE = os.getenv("LOG_FILE", "discord.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # rotate the log file at this size
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))  # rotated files to keep
+LOG_SAMPLE_INTERVAL = int(os.getenv("LOG_SAMPLE_INTERVAL", "60"))  # seconds between messages sharing a sample key
+
+class LogSampler(logging.Filter):
+    """
+    Rate-limits repetitive messages: records logged with extra={"sample": key} pass at most
+    once per interval per key, and the next one that passes reports how many were suppressed.
+    """
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self._last_emitted: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        if now - self._last_emitted.get(key, -self.interval) < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+        self._last_emitted[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+# Log calls only enqueue the record; a listener thread does the formatting and disk I/O,
+# so a slow disk never blocks the event loop (gateway heartbeats, interaction responses).
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_stream_handler = logging.StreamHandler(sys.stdout)  # Log to stdout for CapRover
+log_file_handler = logging.handlers.RotatingFileHandler(  # Also keep file logging
+    filename=LOG_FILE, encoding="utf-8", mode="a", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
 )
+for log_handler in (log_stream_handler, log_file_handler):
+    log_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_queue_handler = logging.handlers.QueueHandler(log_queue)
+log_queue_handler.addFilter(LogSampler(LOG_SAMPLE_INTERVAL))
+log_listener = logging.handlers.QueueListener(log_queue, log_stream_handler, log_file_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)  # flush what's still queued on shutdown
+
+logging.getLogger().setLevel(logging.INFO)
+logging.getLogger().addHandler(log_queue_handler)
 logger = logging.getLogger('discord')  # Get Discord's logger
 logger.setLevel(logging.INFO)  # Set Discord logger level
 
 # --- Persistence Setup ---
-CHAIN_DATA_FILE = "active_chains.json"
+CHAIN_DATA_FILE = "active_chains.json"  # legacy store, imported into CHAIN_DB_FILE once
+CHAIN_DB_FILE = os.getenv("CHAIN_DB_FILE", "chains.db")
+CHAIN_WRITE_DEBOUNCE = 0.5  # seconds participant changes are buffered before being written
+CHAIN_WRITE_BATCH_SIZE = 100  # pending rows that trigger an immediate flush
+CHAIN_REFRESH_INTERVAL = 600  # seconds between chain message refreshes (the countdown itself ticks client-side)
+CHAIN_UPDATE_DEBOUNCE = 2  # seconds to collect button clicks before re-rendering the chain message
+EMBED_FIELD_LIMIT = 1024  # max characters in an embed field value
+MESSAGE_EDIT_CONCURRENCY = 4  # message edits in flight across all channels
+MESSAGE_EDIT_DRAIN_TIMEOUT = 10  # seconds queued message edits get to go out on shutdown
+LEADERBOARD_PAGE_SIZE = 10  # participants per leaderboard embed (each is an inline field)
+CHAINBOARD_MAX_AGE = 30  # seconds a chain snapshot may be old before /chainboard fetches a new one
+CHAIN_CLEANUP_DELAY = 5  # seconds after the chain start before its state is dropped
+# Chain status polling adapts between these bounds: backing off while no chain runs, tightening as a timeout nears
+CHAIN_POLL_FLOOR = int(os.getenv("CHAIN_POLL_FLOOR", "15"))
+CHAIN_POLL_CEILING = int(os.getenv("CHAIN_POLL_CEILING", "600"))
+CHAIN_POLL_ACTIVE_INTERVAL = 60  # seconds between polls while a chain is running
+CHAIN_POLL_COUNTDOWN_LEAD = 300  # seconds before a /chain countdown ends to start polling at the floor
+# Seconds left on the chain timeout at which "about to break" alerts are sent
+CHAIN_TIMEOUT_ALERTS = sorted({int(seconds) for seconds in os.getenv("CHAIN_TIMEOUT_ALERTS", "90,60,30").split(",") if seconds.strip()}, reverse=True)
+
+# --- Faction Setup ---
+# Torn faction ID -> Discord role name
+FACTION_ROLES = {
+    53180: "faction -I-",
+    55332: "faction -II-"
+}
+# "roster" resolves members from the faction member lists (one request per faction),
+# "profile" looks up every member's profile individually
+FACTION_SYNC_MODE = os.getenv("FACTION_SYNC_MODE", "roster").lower()
+# Full sweeps are only a consistency check; changes are picked up incrementally in between
+FACTION_SYNC_INTERVAL = int(os.getenv("FACTION_SYNC_INTERVAL", "21600" if FACTION_SYNC_MODE == "roster" else "1800"))
+FACTION_ROSTER_REFRESH_INTERVAL = int(os.getenv("FACTION_ROSTER_REFRESH_INTERVAL", "300"))  # seconds between roster polls
+DIRTY_MEMBER_DEBOUNCE = 2  # seconds to batch member events before reconciling
+ROLE_EDIT_CONCURRENCY = int(os.getenv("ROLE_EDIT_CONCURRENCY", "4"))  # role edits in flight across all guilds
+TORN_ID_PATTERN = re.compile(r'\[(\d+)\]$')
 
 # Load environment variables
 load_dotenv()
 token = os.getenv("DISCORD_TOKEN")
 torn_api_key = os.getenv("TORN_API_KEY")
+# Extra keys donated by faction members, comma separated
+torn_api_keys = [key.strip() for key in os.getenv("TORN_API_KEYS", "").split(",") if key.strip()]
+if torn_api_key and torn_api_key not in torn_api_keys:
+    torn_api_keys.insert(0, torn_api_key)
 if not token:
     logger.error("DISCORD_TOKEN not found in .env file")
     raise ValueError("DISCORD_TOKEN not found in .env file")
-if not torn_api_key:
+if not torn_api_keys:
     logger.error("TORN_API_KEY not found in .env file")
     raise ValueError("TORN_API_KEY not found in .env file")
 
@@ -47,6 +141,927 @@ intents.members = True
 intents.guild_messages = True
 intents.guilds = True
 
+# --- Torn API Client ---
+TORN_API_BASE = "https://api.torn.com"
+TORN_API_TIMEOUT = 10  # seconds per request
+TORN_API_POOL_SIZE = 20  # max pooled connections to api.torn.com
+TORN_REQUESTS_PER_MINUTE = int(os.getenv("TORN_REQUESTS_PER_MINUTE", "100"))  # Torn's per-key budget
+TORN_BURST_SIZE = 10  # requests that may go out back-to-back before refill pacing kicks in
+TORN_INTERACTIVE_RESERVE = 3  # tokens only interactive requests may spend
+TORN_SYNC_LOOKUPS_PER_KEY = 4  # concurrent role sync lookups per API key in the pool
+# The profile cache absorbs bursts of lookups for the same users (/setnick retries, member event reconciles).
+# It deliberately doesn't serve the profile-mode sweep: the TTL is shorter than FACTION_SYNC_INTERVAL, so every
+# sweep sees fresh factions, and PROFILE_CACHE_SIZE needn't cover every linked member.
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "5000"))  # max cached user profiles
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "600"))  # seconds a profile stays fresh
+PROFILE_CACHE_NEGATIVE_TTL = int(os.getenv("PROFILE_CACHE_NEGATIVE_TTL", "120"))  # seconds to remember unknown users
+# Error codes meaning "no such user": Torn reports 6 (Incorrect ID). Code 2 is a bad key, see TORN_KEY_ERROR_CODES
+TORN_USER_NOT_FOUND_CODES = (6,)
+TORN_DEBUG_PAYLOADS = os.getenv("TORN_DEBUG_PAYLOADS", "").lower() in ("1", "true", "yes")  # dump raw responses at DEBUG
+RANKED_WAR_POLL_INTERVAL = 60  # seconds between ranked war checks
+WARBOARD_TOP_CONTRIBUTORS = 10  # members listed on the war scoreboard
+SERVICE_RESTART_BACKOFF = 5  # seconds before restarting a crashed background service, doubled per crash
+SERVICE_RESTART_BACKOFF_MAX = 300
+SERVICE_STABLE_AFTER = 600  # seconds a service must run before its backoff resets
+
+# Request priorities (lower value is served first)
+PRIORITY_INTERACTIVE = 0  # slash commands a user is waiting on
+PRIORITY_POLL = 1  # chain / ranked war pollers
+PRIORITY_BACKGROUND = 2  # bulk role synchronization
+
+# --- Metrics ---
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # port of the Prometheus endpoint, 0 disables it
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+LOOP_LAG_INTERVAL = 1.0  # seconds between event loop lag samples
+# Opt-in stall detector: a watchdog thread captures what blocks the event loop for longer than the threshold
+LAG_MONITOR_ENABLED = os.getenv("LAG_MONITOR", "").lower() in ("1", "true", "yes")
+LAG_MONITOR_THRESHOLD = float(os.getenv("LAG_MONITOR_THRESHOLD", "0.25"))  # seconds
+LAG_MONITOR_INTERVAL = 0.05  # seconds between heartbeats on the event loop
+
+class Metrics:
+    """
+    Minimal Prometheus registry: counters, gauges and histograms keyed by label values,
+    rendered in the text exposition format. Recording is a dict update, cheap enough for hot paths.
+    """
+    def __init__(self):
+        self._meta: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}  # name -> (type, help, buckets)
+        self._values: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, List[float]]] = {}  # labels -> bucket counts + [sum, count]
+        self._collectors = []  # called before rendering, to refresh gauges that are read on demand
+
+    def describe(self, name: str, kind: str, help_text: str, buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self._meta[name] = (kind, help_text, buckets)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1):
+        series = self._values.setdefault(name, {})
+        key = tuple(sorted((labels or {}).items()))
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        self._values.setdefault(name, {})[tuple(sorted((labels or {}).items()))] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        buckets = self._meta[name][2]
+        key = tuple(sorted((labels or {}).items()))
+        counts = self._histograms.setdefault(name, {}).get(key)
+        if counts is None:
+            counts = self._histograms[name][key] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    @staticmethod
+    def _labels(pairs) -> str:
+        if not pairs:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for name, (kind, help_text, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for key, counts in self._histograms.get(name, {}).items():
+                    for bound, count in zip(buckets, counts):
+                        lines.append(f"{name}_bucket{self._labels(key + (('le', bound),))} {count}")
+                    lines.append(f"{name}_bucket{self._labels(key + (('le', '+Inf'),))} {counts[-1]}")
+                    lines.append(f"{name}_sum{self._labels(key)} {counts[-2]}")
+                    lines.append(f"{name}_count{self._labels(key)} {counts[-1]}")
+            else:
+                for key, value in self._values.get(name, {}).items():
+                    lines.append(f"{name}{self._labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("torn_api_request_seconds", "histogram", "Torn API request latency by section and selection.")
+metrics.describe("torn_api_errors_total", "counter", "Failed Torn API requests by Torn error code, or http_<status> / network.")
+metrics.describe("torn_requests_coalesced_total", "counter", "Torn API calls served by an identical request already in flight.")
+metrics.describe("discord_rate_limits_total", "counter",
+                 "Discord HTTP 429 responses discord.py logs at WARNING. Sub-ratelimit 429s are included, "
+                 "Cloudflare 429s (raised as HTTPException, never logged) are not.")
+metrics.describe("discord_global_rate_limits_total", "counter", "Discord 429 responses that hit the global rate limit.")
+metrics.describe("interaction_ack_seconds", "histogram", "Time from an interaction's creation to its first response, by command.")
+metrics.describe("active_chains", "gauge", "Chains currently organized with /chain.")
+metrics.describe("chain_lifecycles_scheduled_total", "counter", "Chains whose deadlines were (re)scheduled.")
+metrics.describe("faction_sync_duration_seconds", "histogram", "Duration of faction role sync passes.", METRICS_DURATION_BUCKETS)
+metrics.describe("faction_sync_members_processed", "gauge", "Members checked by the last faction role sync pass.")
+metrics.describe("faction_sync_members_processed_total", "counter", "Members checked by faction role sync passes.")
+metrics.describe("event_loop_lag_seconds", "histogram", "How late the event loop ran a sleeping task.")
+metrics.describe("chain_participant_writes_total", "counter", "Chain participant changes handed to the write-behind buffer.")
+metrics.describe("chain_participant_rows_written_total", "counter", "Chain participant rows written to the chain store.")
+metrics.describe("chain_participant_flushes_total", "counter", "Write-behind transactions against the chain store.")
+metrics.describe("chain_participant_writes_coalesced_total", "counter", "Participant changes replaced by a later click before reaching disk.")
+
+class DiscordRateLimitCounter(logging.Filter):
+    """
+    Counts the 429 responses discord.py's HTTP client logs; it has no other hook for them.
+    Only WARNING records are matched: the DEBUG "received a 429 despite having ... remaining" line for
+    sub-ratelimits is below the discord logger's level, but discord.py follows it with the WARNING one.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            message = record.msg if isinstance(record.msg, str) else ""
+            if "responded with 429" in message:
+                metrics.inc("discord_rate_limits_total")
+            elif message.startswith("Global rate limit has been hit"):
+                metrics.inc("discord_global_rate_limits_total")
+        return True
+
+logging.getLogger("discord.http").addFilter(DiscordRateLimitCounter())
+
+def observe_interaction_ack(interaction: discord.Interaction, name: Optional[str] = None):
+    """Records how long an interaction waited for its first response (Discord allows 3 seconds)."""
+    if name is None:
+        name = interaction.command.qualified_name if interaction.command else "unknown"
+    latency = (datetime.now(timezone.utc) - interaction.created_at).total_seconds()
+    metrics.observe("interaction_ack_seconds", max(latency, 0), {"command": name})
+
+class TokenBucket:
+    """
+    Token bucket sized so that no rolling 60 second window can exceed requests_per_minute:
+    the burst capacity is taken out of the per-minute refill rate.
+    """
+    def __init__(self, requests_per_minute: int, burst: int):
+        self.capacity = max(1, min(burst, requests_per_minute))
+        self.rate = max(requests_per_minute - self.capacity, 1) / 60  # tokens per second
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, tokens: float) -> float:
+        """Seconds until the bucket holds at least `tokens` tokens."""
+        self.refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+# Torn error codes that are a problem with the key itself, and how long to park the key for (seconds)
+TORN_KEY_ERROR_CODES = {
+    2: 3600,   # Incorrect key
+    5: 60,     # Too many requests
+    8: 60,     # IP block
+    10: 3600,  # Key owner is in federal jail
+    13: 3600,  # Key disabled due to owner inactivity
+    14: 3600,  # Daily read limit reached
+    18: 3600,  # Key paused by owner
+}
+
+def mask_api_key(api_key: str) -> str:
+    """Shortens an API key to something safe to log."""
+    return f"{api_key[:4]}…" if len(api_key) > 4 else "…"
+
+class TornKeySlot:
+    """One API key in the pool with its own request budget."""
+    def __init__(self, api_key: str, requests_per_minute: int, burst: int):
+        self.api_key = api_key
+        self.bucket = TokenBucket(requests_per_minute, burst)
+        self.parked_until = 0.0
+        self.requests = 0
+
+    def is_parked(self) -> bool:
+        return time.monotonic() < self.parked_until
+
+class TornRequestScheduler:
+    """
+    Central scheduler every Torn API request has to pass through.
+    Each key in the pool has its own token bucket; callers wait in a priority queue and are
+    handed whichever usable key currently has the most budget left, so load spreads evenly
+    across keys. Interactive commands jump ahead of queued background traffic, and a few
+    tokens per key are held back for them so a big role sync can never drain the pool.
+    """
+    def __init__(self, api_keys: List[str], requests_per_minute: int = TORN_REQUESTS_PER_MINUTE,
+                 burst: int = TORN_BURST_SIZE, interactive_reserve: int = TORN_INTERACTIVE_RESERVE):
+        self.slots = [TornKeySlot(key, requests_per_minute, burst) for key in api_keys]
+        capacity = min(slot.bucket.capacity for slot in self.slots)
+        self.interactive_reserve = min(interactive_reserve, capacity - 1)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _tokens_required(self, priority: int) -> float:
+        return 1 if priority <= PRIORITY_INTERACTIVE else 1 + self.interactive_reserve
+
+    def _try_take(self, priority: int) -> Optional[str]:
+        required = self._tokens_required(priority)
+        best = None
+        for slot in self.slots:
+            if slot.is_parked():
+                continue
+            slot.bucket.refill()
+            if slot.bucket.tokens >= required and (best is None or slot.bucket.tokens > best.bucket.tokens):
+                best = slot
+        if best is None:
+            return None
+        best.bucket.tokens -= 1
+        best.requests += 1
+        return best.api_key
+
+    def _time_until_available(self, priority: int) -> Optional[float]:
+        """Seconds until some key can serve `priority`, or None if every key is parked."""
+        usable = [slot for slot in self.slots if not slot.is_parked()]
+        if not usable:
+            return None
+        return min(slot.bucket.time_until(self._tokens_required(priority)) for slot in usable)
+
+    def park(self, api_key: str, error_code: int):
+        """Takes a key out of rotation after Torn rejected it."""
+        duration = TORN_KEY_ERROR_CODES.get(error_code, 60)
+        for slot in self.slots:
+            if slot.api_key == api_key:
+                slot.parked_until = time.monotonic() + duration
+                logger.warning(f"Parking Torn API key {mask_api_key(api_key)} for {duration}s after error code {error_code}.")
+        self._wakeup.set()
+
+    def available_keys(self) -> int:
+        return sum(1 for slot in self.slots if not slot.is_parked())
+
+    def queued(self) -> Dict[int, int]:
+        """Returns the number of waiting requests per priority."""
+        counts: Dict[int, int] = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                counts[priority] = counts.get(priority, 0) + 1
+        return counts
+
+    async def acquire(self, priority: int = PRIORITY_BACKGROUND) -> Optional[str]:
+        """
+        Waits for a request slot and returns the API key to use for it.
+        Returns None if every key in the pool is parked.
+        """
+        if not self._waiters:
+            api_key = self._try_take(priority)
+            if api_key:
+                return api_key
+            if not self.available_keys():
+                return None
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()  # a new waiter may outrank the one the dispatcher is sleeping for
+        return await future
+
+    async def _dispatch(self):
+        """Releases queued waiters in priority order as the buckets refill."""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():  # caller was cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+
+            api_key = self._try_take(priority)
+            if api_key:
+                heapq.heappop(self._waiters)
+                future.set_result(api_key)
+                continue
+
+            delay = self._time_until_available(priority)
+            if delay is None:
+                # Every key is parked; fail fast instead of holding commands for minutes
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a per-entry TTL."""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Dict, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)  # evict least recently used
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class TornAPIClient:
+    """
+    Long-lived Torn API client.
+    One aiohttp session is shared by every caller so connections to api.torn.com
+    are kept alive and reused instead of doing a new TCP+TLS handshake per call.
+    """
+    def __init__(self, api_keys: List[str], base_url: str = TORN_API_BASE, timeout: float = TORN_API_TIMEOUT):
+        self.scheduler = TornRequestScheduler(api_keys)
+        self.profile_cache = TTLCache(PROFILE_CACHE_SIZE)
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=min(5, timeout))
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Creates the pooled session lazily, since it must be created inside the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=TORN_API_POOL_SIZE,
+                ttl_dns_cache=300,  # cache DNS lookups for 5 minutes
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def _request(self, section: str, entity_id: str, selections: str,
+                       priority: int = PRIORITY_BACKGROUND, **params) -> Optional[Dict]:
+        """
+        Performs a GET request against the Torn API once the scheduler grants a slot.
+        Identical requests made while one is in flight share its result instead of hitting the API again,
+        so callers must treat the returned data as read-only.
+        Returns the decoded JSON (which may contain an 'error' object) or None if the HTTP request failed.
+        """
+        request_key = (section, str(entity_id), selections,
+                       tuple(sorted((name, str(value)) for name, value in params.items() if value is not None)))
+        in_flight = self._in_flight.get(request_key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self._fetch(section, entity_id, selections, priority, **params))
+            self._in_flight[request_key] = in_flight
+            in_flight.add_done_callback(lambda _: self._in_flight.pop(request_key, None))
+        else:
+            metrics.inc("torn_requests_coalesced_total", {"section": section, "selection": selections})
+        # Shielded so one caller being cancelled doesn't cancel the request for everyone else
+        return await asyncio.shield(in_flight)
+
+    async def _fetch(self, section: str, entity_id: str, selections: str, priority: int, **params) -> Optional[Dict]:
+        url = f"{self.base_url}/{section}/{entity_id}"
+        data = None
+        # A key Torn rejects is parked and the request is retried on another key
+        for _ in range(len(self.scheduler.slots)):
+            api_key = await self.scheduler.acquire(priority)
+            if api_key is None:
+                logger.error(f"No usable Torn API key for {section}/{selections} request, all keys are parked.")
+                return data
+
+            query = {"selections": selections, "key": api_key}
+            query.update({name: str(value) for name, value in params.items() if value is not None})
+
+            started = time.monotonic()
+            try:
+                async with self._get_session().get(url, params=query) as response:
+                    if response.status != 200:
+                        logger.error(f"Torn API {section}/{selections} request for {entity_id} failed with status {response.status}")
+                        metrics.inc("torn_api_errors_total", {"code": f"http_{response.status}"})
+                        return None
+                    data = await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                metrics.inc("torn_api_errors_total", {"code": "network"})
+                raise
+            finally:
+                metrics.observe("torn_api_request_seconds", time.monotonic() - started,
+                                {"section": section, "selection": selections})
+
+            error_code = data.get('error', {}).get('code') if isinstance(data, dict) else None
+            if error_code is not None:
+                metrics.inc("torn_api_errors_total", {"code": str(error_code)})
+            if error_code not in TORN_KEY_ERROR_CODES:
+                return data
+            self.scheduler.park(api_key, error_code)
+        # Every key was rejected: the key error is handed back but says nothing about the entity, callers mustn't cache it
+        return data
+
+    async def get_user_profile(self, user_id: str, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict]:
+        """
+        Fetches the 'profile' selection for a Torn user.
+        Profiles are served from the profile cache while fresh; "user not found" answers
+        are cached for a shorter time so stale IDs don't cost a request on every sync.
+        Key errors are never cached, they say nothing about the user.
+        """
+        cache_key = str(user_id)
+        cached = self.profile_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        data = await self._request("user", user_id, "profile", priority=priority)
+        if data is not None:
+            if 'error' not in data:
+                self.profile_cache.set(cache_key, data, PROFILE_CACHE_TTL)
+            elif data['error'].get('code') in TORN_USER_NOT_FOUND_CODES:
+                self.profile_cache.set(cache_key, data, PROFILE_CACHE_NEGATIVE_TTL)
+        return data
+
+    async def get_faction_basic(self, faction_id: str, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict]:
+        """Fetches the 'basic' selection for a faction, which includes its member roster."""
+        return await self._request("faction", faction_id, "basic", priority=priority)
+
+    async def get_faction_chain(self, faction_id: str, priority: int = PRIORITY_POLL,
+                                from_timestamp: Optional[int] = None) -> Optional[Dict]:
+        """Fetches the 'chain' selection for a faction, optionally only log entries since `from_timestamp`."""
+        return await self._request("faction", faction_id, "chain", priority=priority, **{"from": from_timestamp})
+
+    async def get_faction_ranked_wars(self, faction_id: str, priority: int = PRIORITY_POLL) -> Optional[Dict]:
+        """Fetches the 'rankedwars' selection for a faction."""
+        return await self._request("faction", faction_id, "rankedwars", priority=priority)
+
+    async def close(self):
+        """Closes the pooled session and all of its connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+class ChainStore:
+    """
+    Persistent store for active chains, their participants and announced ranked wars, backed by SQLite in WAL mode.
+    Every query runs on one dedicated worker thread so disk I/O never blocks the event loop,
+    and each change is its own small transaction, so a crash can't leave a half-written file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chain-store")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """Opens the connection on the worker thread the first time it is needed."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chains (
+                    channel_id INTEGER PRIMARY KEY,
+                    message_id INTEGER NOT NULL,
+                    end_time_utc TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    organizer TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS participants (
+                    message_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    display_name TEXT NOT NULL,
+                    is_joining INTEGER NOT NULL,
+                    PRIMARY KEY (message_id, user_id)
+                );
+                CREATE TABLE IF NOT EXISTS announced_wars (
+                    war_id TEXT PRIMARY KEY,
+                    announced_at INTEGER NOT NULL
+                );
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _save_chain(self, channel_id: int, chain: Dict):
+        db = self._db()
+        with db:
+            previous = db.execute("SELECT message_id FROM chains WHERE channel_id = ?", (channel_id,)).fetchone()
+            if previous and previous[0] != chain['message_id']:
+                db.execute("DELETE FROM participants WHERE message_id = ?", (previous[0],))
+            db.execute(
+                "INSERT OR REPLACE INTO chains (channel_id, message_id, end_time_utc, timestamp, organizer) VALUES (?, ?, ?, ?, ?)",
+                (channel_id, chain['message_id'], chain['end_time_utc'].isoformat(), chain['timestamp'], chain['organizer'])
+            )
+            db.execute("DELETE FROM participants WHERE message_id = ?", (chain['message_id'],))
+            db.executemany(
+                "INSERT INTO participants (message_id, user_id, display_name, is_joining) VALUES (?, ?, ?, ?)",
+                [(chain['message_id'], user_id, name, 1) for user_id, name in chain.get('joiners', [])] +
+                [(chain['message_id'], user_id, name, 0) for user_id, name in chain.get('cant_make_it', [])]
+            )
+
+    async def save_chain(self, channel_id: int, chain: Dict):
+        """Writes a chain and its full participant list."""
+        await self._run(self._save_chain, channel_id, chain)
+
+    def _set_participants(self, rows: List[Tuple[int, int, str, bool]]):
+        db = self._db()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO participants (message_id, user_id, display_name, is_joining) VALUES (?, ?, ?, ?)",
+                [(message_id, user_id, name, int(is_joining)) for message_id, user_id, name, is_joining in rows]
+            )
+
+    async def set_participants(self, rows: List[Tuple[int, int, str, bool]]):
+        """Records members' answers as (message_id, user_id, display_name, is_joining), replacing earlier answers."""
+        await self._run(self._set_participants, rows)
+
+    def _delete_chain(self, channel_id: int, message_id: Optional[int]):
+        db = self._db()
+        with db:
+            row = db.execute("SELECT message_id FROM chains WHERE channel_id = ?", (channel_id,)).fetchone()
+            if message_id is not None:
+                db.execute("DELETE FROM participants WHERE message_id = ?", (message_id,))
+            if row and (message_id is None or row[0] == message_id):
+                db.execute("DELETE FROM participants WHERE message_id = ?", (row[0],))
+                db.execute("DELETE FROM chains WHERE channel_id = ?", (channel_id,))
+
+    async def delete_chain(self, channel_id: int, message_id: Optional[int] = None):
+        """
+        Removes a chain and its participants.
+        With a message_id, a newer chain that has since taken over the channel is left alone.
+        """
+        await self._run(self._delete_chain, channel_id, message_id)
+
+    def _load_chains(self) -> Dict[int, Dict]:
+        db = self._db()
+        chains = {}
+        for channel_id, message_id, end_time_utc, timestamp, organizer in db.execute(
+                "SELECT channel_id, message_id, end_time_utc, timestamp, organizer FROM chains"):
+            chains[channel_id] = {
+                'message_id': message_id,
+                'end_time_utc': datetime.fromisoformat(end_time_utc),
+                'timestamp': timestamp,
+                'organizer': organizer,
+                'joiners': [],
+                'cant_make_it': []
+            }
+        by_message = {chain['message_id']: chain for chain in chains.values()}
+        for message_id, user_id, display_name, is_joining in db.execute(
+                "SELECT message_id, user_id, display_name, is_joining FROM participants"):
+            chain = by_message.get(message_id)
+            if chain:
+                chain['joiners' if is_joining else 'cant_make_it'].append((user_id, display_name))
+        return chains
+
+    async def load_chains(self) -> Dict[int, Dict]:
+        """Returns {channel_id: chain} for every stored chain."""
+        return await self._run(self._load_chains)
+
+    def _load_announced_wars(self) -> Set[str]:
+        return {war_id for war_id, in self._db().execute("SELECT war_id FROM announced_wars")}
+
+    async def load_announced_wars(self) -> Set[str]:
+        """Returns the IDs of the ranked wars that were already announced."""
+        return await self._run(self._load_announced_wars)
+
+    def _add_announced_war(self, war_id: str):
+        db = self._db()
+        with db:
+            db.execute("INSERT OR REPLACE INTO announced_wars (war_id, announced_at) VALUES (?, ?)", (war_id, int(time.time())))
+
+    async def add_announced_war(self, war_id: str):
+        await self._run(self._add_announced_war, war_id)
+
+    def _remove_announced_wars(self, war_ids: Set[str]):
+        db = self._db()
+        with db:
+            db.executemany("DELETE FROM announced_wars WHERE war_id = ?", [(war_id,) for war_id in war_ids])
+
+    async def remove_announced_wars(self, war_ids: Set[str]):
+        await self._run(self._remove_announced_wars, war_ids)
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def close(self):
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+class ChainWriteBehind:
+    """
+    Write-behind buffer between chain button clicks and the chain store.
+    Clicks only mark a participant row dirty; rows are flushed in one transaction after a short
+    debounce or once enough are pending, and a member who clicks several times costs one row.
+    """
+    def __init__(self, store: ChainStore, debounce: float = CHAIN_WRITE_DEBOUNCE, batch_size: int = CHAIN_WRITE_BATCH_SIZE):
+        self.store = store
+        self.debounce = debounce
+        self.batch_size = batch_size
+        self._pending: Dict[Tuple[int, int], Tuple[int, int, str, bool]] = {}
+        self._batch_full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        # Metrics
+        self.requested_writes = 0
+        self.flushed_rows = 0
+        self.discarded_rows = 0
+        self.flushes = 0
+
+    @property
+    def coalesced_writes(self) -> int:
+        """Writes that never reached disk because a later click replaced them."""
+        return self.requested_writes - self.flushed_rows - self.discarded_rows - len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'pending': len(self._pending),
+            'requested': self.requested_writes,
+            'written': self.flushed_rows,
+            'flushes': self.flushes,
+            'coalesced': self.coalesced_writes,
+            'discarded': self.discarded_rows
+        }
+
+    def set_participant(self, message_id: int, user_id: int, display_name: str, is_joining: bool):
+        """Marks a member's answer dirty. Never waits on disk."""
+        self._pending[(message_id, user_id)] = (message_id, user_id, display_name, is_joining)
+        self.requested_writes += 1
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_when_due())
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+
+    def discard(self, message_id: int):
+        """Drops pending rows of a chain that is being removed."""
+        for key in [key for key in self._pending if key[0] == message_id]:
+            del self._pending[key]
+            self.discarded_rows += 1
+
+    async def _flush_when_due(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=self.debounce)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Writes every pending row in one transaction."""
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, {}
+        try:
+            await self.store.set_participants(list(rows.values()))
+            self.flushed_rows += len(rows)
+            self.flushes += 1
+        except Exception as e:
+            logger.error(f"Failed to flush {len(rows)} chain participant changes: {e}")
+            # Keep the rows for the next flush unless a newer click replaced them
+            for key, row in rows.items():
+                self._pending.setdefault(key, row)
+
+    async def close(self):
+        """Flushes everything still pending; called on shutdown."""
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush()
+        logger.info(f"Chain write-behind: {self.requested_writes} writes requested, {self.flushed_rows} rows written "
+                    f"in {self.flushes} flushes, {self.coalesced_writes} saved by coalescing.")
+
+class ScheduledDeadline:
+    """A callback registered with the DeadlineScheduler."""
+    def __init__(self, when: float, name: str, callback):
+        self.when = when
+        self.name = name
+        self.callback = callback
+        self.cancelled = False
+        self.done = False
+
+class DeadlineScheduler:
+    """
+    One heap-backed scheduler for every timed job (chain refresh ticks, starts, cleanups).
+    A single task sleeps until the earliest deadline and fires callbacks as their own tasks,
+    instead of one sleeping task per job.
+    """
+    def __init__(self):
+        self._heap: List[Tuple[float, int, ScheduledDeadline]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    def schedule(self, when: float, name: str, callback) -> ScheduledDeadline:
+        """Runs `callback()` (a coroutine function) at epoch time `when`."""
+        deadline = ScheduledDeadline(when, name, callback)
+        heapq.heappush(self._heap, (when, next(self._counter), deadline))
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        if self._heap[0][2] is deadline:
+            self._wakeup.set()  # new earliest deadline
+        return deadline
+
+    def cancel(self, deadline: ScheduledDeadline):
+        deadline.cancelled = True  # lazily dropped when it reaches the top of the heap
+
+    def pending(self) -> List[ScheduledDeadline]:
+        """Returns the pending deadlines, earliest first."""
+        return [deadline for _, _, deadline in sorted(self._heap) if not deadline.cancelled]
+
+    async def _run(self):
+        while self._heap:
+            when, _, deadline = self._heap[0]
+            if deadline.cancelled:
+                heapq.heappop(self._heap)
+                continue
+
+            delay = when - time.time()
+            if delay <= 0:
+                heapq.heappop(self._heap)
+                deadline.done = True
+                asyncio.create_task(self._fire(deadline))
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, deadline: ScheduledDeadline):
+        try:
+            await deadline.callback()
+        except Exception as e:
+            logger.error(f"Scheduled job '{deadline.name}' failed: {e}")
+
+class MessageEditDispatcher:
+    """
+    Outbound queue for every message edit the bot makes, keyed by message ID.
+    Only the newest pending payload per message is kept, so stale edits are dropped instead of
+    queueing up behind a rate limit. Channels are served round-robin with one edit in flight per
+    channel (edits share the channel's rate-limit bucket) and MESSAGE_EDIT_CONCURRENCY overall.
+    """
+    def __init__(self, concurrency: int = MESSAGE_EDIT_CONCURRENCY):
+        self.concurrency = concurrency
+        self._pending: Dict[int, Tuple[object, Dict, List[asyncio.Future]]] = {}
+        self._channel_queues: Dict[int, deque] = {}  # channel_id -> message IDs waiting to be edited
+        self._ready_channels: deque = deque()  # channels with queued edits and nothing in flight
+        self._busy_channels: Set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()  # set while nothing is queued or in flight
+        self._idle.set()
+        self._workers: List[asyncio.Task] = []
+        self._closed = False
+        # Metrics
+        self.submitted = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'queue_depth': len(self._pending),
+            'in_flight': len(self._busy_channels),
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+    def submit(self, message, **kwargs) -> asyncio.Future:
+        """
+        Queues `message.edit(**kwargs)`, replacing any edit still pending for the same message.
+        The returned future resolves once the newest payload was sent, or raises its error.
+        Callers that don't care about the outcome don't need to await it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())  # failures are logged here
+        if self._closed:
+            future.set_exception(RuntimeError("Message edit dispatcher is closed"))
+            return future
+        self.submitted += 1
+
+        pending = self._pending.get(message.id)
+        if pending is not None:
+            # Superseded: the older payload is never sent, its waiters get the newer edit's outcome
+            self._pending[message.id] = (message, kwargs, pending[2] + [future])
+            self.dropped += 1
+            return future
+
+        self._pending[message.id] = (message, kwargs, [future])
+        self._idle.clear()
+        channel_id = message.channel.id
+        queue = self._channel_queues.setdefault(channel_id, deque())
+        queue.append(message.id)
+        if len(queue) == 1 and channel_id not in self._busy_channels:
+            self._ready_channels.append(channel_id)
+            self._wakeup.set()
+
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._worker()))
+        return future
+
+    async def edit(self, message, **kwargs):
+        """Queues an edit and waits for it to be sent."""
+        return await self.submit(message, **kwargs)
+
+    async def _worker(self):
+        while True:
+            while not self._ready_channels:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            channel_id = self._ready_channels.popleft()
+            message_id = self._channel_queues[channel_id].popleft()
+            message, kwargs, futures = self._pending.pop(message_id)
+            self._busy_channels.add(channel_id)
+            try:
+                result = await message.edit(**kwargs)
+                self.sent += 1
+                for future in futures:
+                    if not future.done():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                # Shut down mid-edit: its waiters must not be left hanging
+                self.failed += 1
+                self._fail(futures)
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Edit of message {message_id} in channel {channel_id} failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                self._busy_channels.discard(channel_id)
+                if self._channel_queues[channel_id]:
+                    self._ready_channels.append(channel_id)
+                    self._wakeup.set()
+                else:
+                    del self._channel_queues[channel_id]
+                if not self._pending and not self._busy_channels:
+                    self._idle.set()
+
+    async def close(self, timeout: float = MESSAGE_EDIT_DRAIN_TIMEOUT):
+        """
+        Sends the edits still queued (final chain states, cancellations) for up to `timeout` seconds,
+        then stops the workers. Callers of edits that didn't make it get an error instead of waiting forever.
+        """
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{len(self._pending) + len(self._busy_channels)} message edits were not sent within {timeout}s of shutdown.")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for _, _, futures in self._pending.values():
+            self._fail(futures)
+        self.failed += len(self._pending)
+        self._pending.clear()
+        self._channel_queues.clear()
+        self._ready_channels.clear()
+
+    @staticmethod
+    def _fail(futures: List[asyncio.Future]):
+        for future in futures:
+            if not future.done():
+                future.set_exception(RuntimeError("Message edit dispatcher closed before the edit was sent"))
+
+class ChainPollStats:
+    """Measures how quickly chain starts are detected against how many status polls it costs."""
+    def __init__(self):
+        self.started_at = time.time()
+        self.polls = 0
+        self.interval = CHAIN_POLL_CEILING
+        self.polls_since_detection = 0
+        self.detections = deque(maxlen=20)  # (detection latency in seconds, polls spent since the previous detection)
+
+    def record_poll(self, interval: float):
+        self.polls += 1
+        self.polls_since_detection += 1
+        self.interval = interval
+
+    def record_detection(self, latency: float):
+        self.detections.append((latency, self.polls_since_detection))
+        self.polls_since_detection = 0
+
+    def stats(self) -> Dict:
+        hours = max((time.time() - self.started_at) / 3600, 1 / 60)
+        latencies = sorted(latency for latency, _ in self.detections)
+        return {
+            "interval": self.interval,
+            "polls": self.polls,
+            "polls_per_hour": self.polls / hours,
+            "detections": len(self.detections),
+            "median_latency": latencies[len(latencies) // 2] if latencies else None,
+            "max_latency": latencies[-1] if latencies else None,
+            "polls_per_detection": sum(polls for _, polls in self.detections) / len(self.detections) if self.detections else None,
+        }
+
 class ChainBot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix="!", intents=intents)
@@ -56,8 +1071,53 @@ class ChainBot(commands.Bot):
         self.config = {}
         self.chain_checker_started = False
         self.faction_role_sync_started = False
+        self.war_monitor_started = False
+        self.announced_war_ids: Set[str] = set()  # loaded from the chain store when the monitor starts
+        self.warboard = None  # WarBoard, created on first use
+        self.metrics_runner = None  # aiohttp runner of the metrics endpoint, when enabled
+        self.lag_monitor = None  # LoopLagMonitor, when LAG_MONITOR is enabled
+        # Incremental faction role sync state
+        self.faction_index: Optional[Dict[str, int]] = None
+        self.faction_departures: Set[str] = set()  # Torn IDs seen leaving a faction roster and not back in one since
+        self.dirty_members: Set[Tuple[int, int]] = set()  # (guild_id, member_id)
+        self.dirty_members_event = asyncio.Event()
+        self.nickname_indexes = {}  # guild_id -> NicknameIndex
+        self.torn = TornAPIClient(torn_api_keys)
+        self.chain_store = ChainStore(CHAIN_DB_FILE)
+        self.chain_writer = ChainWriteBehind(self.chain_store)
+        self.scheduler = DeadlineScheduler()
+        self.edit_dispatcher = MessageEditDispatcher()
+        self.chain_feeds = {}  # faction_id -> ChainFeed
+        self.chain_status_subscription = None
+        self.chain_poll_stats = ChainPollStats()
+        self.shutdown_task: Optional[asyncio.Task] = None
         logger.info("ChainBot initialized")
 
+    async def setup_hook(self):
+        # Docker stops the container with SIGTERM, which Client.run doesn't handle: without this the process
+        # dies without close(), losing pending chain writes, queued message edits and buffered log records
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self.handle_sigterm)
+        except NotImplementedError:  # no signal handlers on Windows event loops
+            pass
+
+    def handle_sigterm(self):
+        if self.shutdown_task is None:
+            logger.info("Received SIGTERM, shutting down.")
+            self.shutdown_task = asyncio.create_task(self.close())
+
+    async def close(self):
+        """Closes the Torn API client and flushes the chain store before shutting down the bot."""
+        await self.torn.close()
+        await self.edit_dispatcher.close()
+        await self.chain_writer.close()
+        await self.chain_store.close()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        if self.lag_monitor is not None:
+            self.lag_monitor.stop()
+        await super().close()
+
 bot = ChainBot()
 
 CONFIG_FILE = "config.json"
@@ -69,16 +1129,25 @@ async def load_config():
             bot.config = json.load(f)
             # Ensure new keys are present
             bot.config.setdefault("chain_notification_channel_id", None)
+            bot.config.setdefault("war_notification_channel_id", None)
+            bot.config.setdefault("warboard_channel_id", None)
+            bot.config.setdefault("warboard_message_id", None)
             logger.info("Configuration loaded from config.json.")
     except FileNotFoundError:
         logger.info("config.json not found, starting with default configuration.")
         bot.config = {
-            "chain_notification_channel_id": None
+            "chain_notification_channel_id": None,
+            "war_notification_channel_id": None,
+            "warboard_channel_id": None,
+            "warboard_message_id": None
         }
     except json.JSONDecodeError:
         logger.error("Could not decode config.json. Starting with default configuration.")
         bot.config = {
-            "chain_notification_channel_id": None
+            "chain_notification_channel_id": None,
+            "war_notification_channel_id": None,
+            "warboard_channel_id": None,
+            "warboard_message_id": None
         }
 
 async def save_config():
@@ -91,57 +1160,48 @@ async def save_config():
         logger.error(f"Failed to save configuration: {e}")
 
 
-async def save_active_chains():
-    """Saves the current state of active chains to a JSON file."""
-    serializable_chains = {}
-    for channel_id, chain_info in bot.active_chains.items():
-        view = chain_info.get('view')
-        if not view:
-            continue
-            
-        serializable_chains[channel_id] = {
-            'message_id': chain_info['message_id'],
-            'end_time_utc': chain_info['end_time_utc'].isoformat(),
-            'timestamp': chain_info['timestamp'],
-            'organizer': chain_info['organizer'],
-            'joiners': [list(item) for item in view.joiners],
-            'cant_make_it': [list(item) for item in view.cant_make_it],
-        }
-
-    try:
-        with open(CHAIN_DATA_FILE, 'w') as f:
-            json.dump(serializable_chains, f, indent=4)
-        logger.info("Successfully saved active chains to disk.")
-    except Exception as e:
-        logger.error(f"Failed to save active chains to disk: {e}")
-
-async def load_and_resume_chains():
-    """Loads chains from disk and resumes their lifecycle tasks."""
-    logger.info("Attempting to load and resume chains from disk...")
+async def import_legacy_chain_file():
+    """Imports chains from the old active_chains.json file into the chain store, once."""
     try:
         with open(CHAIN_DATA_FILE, 'r') as f:
-            chains_to_load = json.load(f)
+            legacy_chains = json.load(f)
     except FileNotFoundError:
-        logger.info("No active_chains.json file found. Starting fresh.")
         return
     except json.JSONDecodeError:
-        logger.error("Could not decode active_chains.json. File might be corrupt. Starting fresh.")
+        logger.error("Could not decode active_chains.json. File might be corrupt. Skipping import.")
+        return
+
+    for channel_id_str, chain_data in legacy_chains.items():
+        chain_data['end_time_utc'] = datetime.fromisoformat(chain_data['end_time_utc'])
+        await bot.chain_store.save_chain(int(channel_id_str), chain_data)
+
+    os.replace(CHAIN_DATA_FILE, f"{CHAIN_DATA_FILE}.migrated")
+    logger.info(f"Imported {len(legacy_chains)} chains from active_chains.json into the chain store.")
+
+async def load_and_resume_chains():
+    """Loads chains from the chain store and resumes their lifecycle tasks."""
+    logger.info("Attempting to load and resume chains from the chain store...")
+    try:
+        await import_legacy_chain_file()
+        chains_to_load = await bot.chain_store.load_chains()
+    except Exception as e:
+        logger.error(f"Could not load chains from the chain store: {e}")
         return
 
     now_utc = datetime.now(timezone.utc)
-    for channel_id_str, chain_data in chains_to_load.items():
-        channel_id = int(channel_id_str)
-        end_time_utc = datetime.fromisoformat(chain_data['end_time_utc'])
+    for channel_id, chain_data in chains_to_load.items():
+        end_time_utc = chain_data['end_time_utc']
 
         if end_time_utc < now_utc:
             logger.info(f"Skipping expired chain in channel {channel_id}.")
+            await bot.chain_store.delete_chain(channel_id)
             continue
         
         try:
             # Recreate the view and restore its state
             view = ChainView(bot, {'organizer': chain_data['organizer']})
-            view.joiners = {tuple(item) for item in chain_data.get('joiners', [])}
-            view.cant_make_it = {tuple(item) for item in chain_data.get('cant_make_it', [])}
+            view.joiners = set(chain_data['joiners'])
+            view.cant_make_it = set(chain_data['cant_make_it'])
             
             # Re-register the view with the bot so it can receive interactions
             bot.add_view(view, message_id=chain_data['message_id'])
@@ -154,17 +1214,147 @@ async def load_and_resume_chains():
                 'view': view
             }
             
-            # Relaunch the lifecycle task
-            asyncio.create_task(manage_chain_lifecycle(channel_id))
+            # Reschedule the chain's deadlines
+            manage_chain_lifecycle(channel_id)
             logger.info(f"Successfully resumed chain in channel {channel_id}.")
             
         except Exception as e:
             logger.error(f"Failed to resume chain for channel {channel_id}: {e}")
 
+async def measure_loop_lag():
+    """Samples event loop lag: how much later than requested a short sleep wakes up."""
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        metrics.observe("event_loop_lag_seconds", max(time.monotonic() - started - LOOP_LAG_INTERVAL, 0))
+
+class LoopLagMonitor:
+    """
+    Measures event loop scheduling delay continuously with a heartbeat task, which also feeds the
+    event_loop_lag_seconds histogram in place of measure_loop_lag. A watchdog thread
+    notices when the heartbeat stalls past the threshold and captures the loop thread's stack
+    while the blocking callback is still running, so offenders can be ranked by /perf.
+    """
+    def __init__(self, threshold: float = LAG_MONITOR_THRESHOLD, interval: float = LAG_MONITOR_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.started_at = time.time()
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.offenders: Dict[str, Dict] = {}  # location -> {"count", "total", "worst", "stack"}
+        self._last_beat = time.monotonic()
+        self._captured: Optional[Tuple[str, str]] = None  # (location, stack) of the current stall
+        self._loop_thread_id: Optional[int] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    async def _heartbeat(self):
+        while not self._stopped.is_set():
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - self._last_beat - self.interval, 0)
+            self._last_beat = now
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe("event_loop_lag_seconds", lag)
+
+            captured, self._captured = self._captured, None
+            if lag >= self.threshold:
+                self.stalls += 1
+                location, stack = captured or ("unknown (finished before it could be captured)", "")
+                self.record(location, stack, lag)
+
+    def record(self, location: str, stack: str, lag: float):
+        offender = self.offenders.get(location)
+        if offender is None:
+            offender = self.offenders[location] = {"count": 0, "total": 0.0, "worst": 0.0, "stack": stack}
+        offender["count"] += 1
+        offender["total"] += lag
+        if lag >= offender["worst"]:
+            offender["worst"] = lag
+            offender["stack"] = stack or offender["stack"]
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms in {location}", extra={"sample": f"loop_stall {location}"})
+
+    def _watch(self):
+        """Runs on the watchdog thread."""
+        while not self._stopped.wait(self.threshold / 4):
+            stalled_for = time.monotonic() - self._last_beat - self.interval
+            if stalled_for < self.threshold or self._captured is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            # Blame the innermost frame of the bot's own code, library frames only say where it ended up
+            blamed = next((entry for entry in reversed(stack) if entry.filename == __file__), stack[-1])
+            self._captured = (f"{blamed.name} ({os.path.basename(blamed.filename)}:{blamed.lineno})",
+                              "".join(traceback.format_list(stack[-8:])))
+
+    def worst_offenders(self, count: int = 5) -> List[Tuple[str, Dict]]:
+        return heapq.nlargest(count, self.offenders.items(), key=lambda entry: entry[1]["worst"])
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+def collect_chain_write_metrics():
+    write_stats = bot.chain_writer.stats()
+    metrics.set("chain_participant_writes_total", write_stats['requested'])
+    metrics.set("chain_participant_rows_written_total", write_stats['written'])
+    metrics.set("chain_participant_flushes_total", write_stats['flushes'])
+    metrics.set("chain_participant_writes_coalesced_total", write_stats['coalesced'])
+
+async def start_metrics_server():
+    """Serves /metrics in the Prometheus text format on METRICS_HOST:METRICS_PORT."""
+    metrics.add_collector(lambda: metrics.set("active_chains", len(bot.active_chains)))
+    metrics.add_collector(collect_chain_write_metrics)
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    bot.metrics_runner = web.AppRunner(app, access_log=None)
+    await bot.metrics_runner.setup()
+    await web.TCPSite(bot.metrics_runner, METRICS_HOST, METRICS_PORT).start()
+    if bot.lag_monitor is None:  # otherwise its heartbeat already feeds event_loop_lag_seconds
+        asyncio.create_task(measure_loop_lag())
+    logger.info(f"Serving metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+async def run_supervised(name: str, service, *args):
+    """
+    Keeps a background service running: whenever it crashes or returns it is restarted,
+    with a backoff that doubles per consecutive failure and resets once it ran stably.
+    """
+    backoff = SERVICE_RESTART_BACKOFF
+    while True:
+        started = time.monotonic()
+        try:
+            await service(*args)
+            logger.warning(f"Background service '{name}' exited unexpectedly.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Background service '{name}' crashed: {e}", exc_info=True)
+
+        if time.monotonic() - started >= SERVICE_STABLE_AFTER:
+            backoff = SERVICE_RESTART_BACKOFF
+        logger.info(f"Restarting background service '{name}' in {backoff}s.")
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, SERVICE_RESTART_BACKOFF_MAX)
+
 @bot.event
 async def on_ready():
     logger.info(f"Logged in as {bot.user}")
     await load_config()  # Load configuration
+    build_nickname_indexes()
     if not bot.persistent_views_loaded:
         await load_and_resume_chains()
         bot.persistent_views_loaded = True
@@ -175,7 +1365,26 @@ async def on_ready():
         
     if not bot.faction_role_sync_started:
         asyncio.create_task(sync_faction_roles_periodically())
+        asyncio.create_task(reconcile_dirty_members_periodically())
+        if FACTION_SYNC_MODE == "roster":
+            asyncio.create_task(refresh_faction_rosters_periodically())
         bot.faction_role_sync_started = True
+
+    # Before the metrics server, which leaves lag sampling to the monitor's heartbeat when it runs
+    if LAG_MONITOR_ENABLED and bot.lag_monitor is None:
+        bot.lag_monitor = LoopLagMonitor()
+        bot.lag_monitor.start()
+        logger.info(f"Event loop lag monitor started (threshold {LAG_MONITOR_THRESHOLD * 1000:.0f}ms).")
+
+    if METRICS_PORT and bot.metrics_runner is None:
+        try:
+            await start_metrics_server()
+        except OSError as e:
+            logger.error(f"Could not start the metrics endpoint on port {METRICS_PORT}: {e}")
+
+    if not bot.war_monitor_started:
+        asyncio.create_task(run_supervised("ranked war monitor", check_ranked_war_status_periodically))
+        bot.war_monitor_started = True
         
     try:
         synced = await bot.tree.sync()
@@ -183,10 +1392,40 @@ async def on_ready():
     except Exception as e:
         logger.error(f"Failed to sync commands: {e}")
 
+@bot.event
+async def on_guild_join(guild):
+    get_nickname_index(guild)
+
+@bot.event
+async def on_guild_remove(guild):
+    bot.nickname_indexes.pop(guild.id, None)
+
 @bot.event
 async def on_member_join(member):
+    get_nickname_index(member.guild).add(member)
+    mark_member_dirty(member)
     await member.send(f"Welcome to the server {member.mention}!")
 
+@bot.event
+async def on_member_remove(member):
+    get_nickname_index(member.guild).remove(member.id)
+
+@bot.event
+async def on_member_update(before, after):
+    # A changed nickname may link the member to a different Torn ID
+    if before.nick != after.nick:
+        get_nickname_index(after.guild).add(after)
+        mark_member_dirty(after)
+
+@bot.event
+async def on_user_update(before, after):
+    # Global name changes alter the display name in every shared guild
+    if before.name != after.name or before.global_name != after.global_name:
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member:
+                get_nickname_index(guild).add(member)
+
 @bot.event
 async def on_message(message):
     if message.author == bot.user:
@@ -203,6 +1442,7 @@ async def on_message(message):
 @app_commands.guild_only()
 async def hello(interaction: discord.Interaction):
     await interaction.response.send_message(f"Hello {interaction.user.mention}!")
+    observe_interaction_ack(interaction)
 
 @bot.tree.command(name="setnick", description="Set your nickname in the format: name [ID]")
 @app_commands.describe(
@@ -217,6 +1457,7 @@ async def setnick(interaction: discord.Interaction, name: str, user_id: str):
 
     # Defer the response since API validation might take some time
     await interaction.response.defer(ephemeral=False)
+    observe_interaction_ack(interaction)
 
     faction_id, error_message = await validate_and_get_faction(name, user_id)
     
@@ -225,12 +1466,7 @@ async def setnick(interaction: discord.Interaction, name: str, user_id: str):
         return
 
     # Faction validation
-    allowed_factions = {
-        53180: "faction -I-",
-        55332: "faction -II-"
-    }
-    
-    if faction_id not in allowed_factions:
+    if faction_id not in FACTION_ROLES:
         await interaction.followup.send(
             f"❌ You must be a member of 'faction -I-' or 'faction -II-' to set your nickname here.",
             ephemeral=False
@@ -266,13 +1502,19 @@ async def setnick(interaction: discord.Interaction, name: str, user_id: str):
         
         # Check for duplicate nicknames
         is_duplicate, existing_member = check_duplicate_nickname(interaction.guild, new_nickname, interaction.user.id)
-        if is_duplicate:
+        is_claimed, claiming_member = check_duplicate_torn_id(interaction.guild, user_id, interaction.user.id)
+        if is_duplicate or is_claimed:
             # Find admin role or mention @everyone if no admin role exists
             admin_role = discord.utils.get(interaction.guild.roles, name="admin") or discord.utils.get(interaction.guild.roles, name="Admin")
             admin_mention = admin_role.mention if admin_role else "@admin"
-            
+
+            if is_duplicate:
+                message = f"❌ Nickname '{new_nickname}' is already in use by {existing_member.mention}. {admin_mention} - duplicate nickname detected!"
+            else:
+                message = f"❌ Torn ID {user_id} is already claimed by {claiming_member.mention}. {admin_mention} - duplicate Torn ID detected!"
+
             await interaction.followup.send(
-                f"❌ Nickname '{new_nickname}' is already in use by {existing_member.mention}. {admin_mention} - duplicate nickname detected!",
+                message,
                 ephemeral=False  # Make this visible to admins
             )
             return
@@ -303,7 +1545,7 @@ async def setnick(interaction: discord.Interaction, name: str, user_id: str):
 
         # 2. Faction Roles
         faction_role_message = ""
-        target_role_name = allowed_factions[faction_id]
+        target_role_name = FACTION_ROLES[faction_id]
         role_i = discord.utils.get(interaction.guild.roles, name="faction -I-")
         role_ii = discord.utils.get(interaction.guild.roles, name="faction -II-")
         
@@ -356,6 +1598,7 @@ async def dm(interaction: discord.Interaction, message: str):
             "I couldn't send you a DM. Please check if you have DMs enabled.",
             ephemeral=True
         )
+    observe_interaction_ack(interaction)
 
 @bot.tree.command(name="poll", description="Create a poll with yes/no voting")
 @app_commands.describe(question="The question to ask in the poll")
@@ -376,6 +1619,7 @@ async def poll(interaction: discord.Interaction, question: str):
     embed.set_footer(text=f"Poll started by {interaction.user.name} • React with ✅ or ❌ to vote")
     
     await interaction.response.send_message(embed=embed)
+    observe_interaction_ack(interaction)
     poll_message = await interaction.original_response()
     await poll_message.add_reaction("✅")
     await poll_message.add_reaction("❌")
@@ -499,54 +1743,123 @@ async def validate_and_get_faction(name: str, user_id: str) -> Tuple[Optional[in
     Returns (faction_id, error_message)
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://api.torn.com/user/{user_id}?selections=profile&key={torn_api_key}"
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return None, "❌ Failed to connect to Torn API. Please try again later."
-                
-                data = await response.json()
-                
-                if 'error' in data:
-                    if data['error']['code'] == 2: # "User not found"
-                         return None, f"❌ User ID {user_id} not found in Torn."
-                    return None, f"❌ API Error: {data['error']['error']}"
-                
-                # Validate name
-                api_name = data.get('name', '').lower()
-                if api_name != name.lower():
-                    actual_name = data.get('name', 'Unknown')
-                    return None, f"❌ Name mismatch! User ID {user_id} belongs to '{actual_name}', not '{name}'."
-
-                # Get faction ID
-                faction_info = data.get('faction', {})
-                faction_id = faction_info.get('faction_id')
-                
-                return int(faction_id) if faction_id and faction_id != 0 else None, ""
-                
+        data = await bot.torn.get_user_profile(user_id, priority=PRIORITY_INTERACTIVE)
+        if data is None:
+            return None, "❌ Failed to connect to Torn API. Please try again later."
+
+        if 'error' in data:
+            if data['error']['code'] in TORN_USER_NOT_FOUND_CODES:
+                 return None, f"❌ User ID {user_id} not found in Torn."
+            return None, f"❌ API Error: {data['error']['error']}"
+
+        # Validate name
+        api_name = data.get('name', '').lower()
+        if api_name != name.lower():
+            actual_name = data.get('name', 'Unknown')
+            return None, f"❌ Name mismatch! User ID {user_id} belongs to '{actual_name}', not '{name}'."
+
+        # Get faction ID
+        faction_info = data.get('faction', {})
+        faction_id = faction_info.get('faction_id')
+        # This profile is newer than any roster departure on record for the user
+        bot.faction_departures.discard(str(user_id))
+
+        return int(faction_id) if faction_id and faction_id != 0 else None, ""
+
     except Exception as e:
         logging.error(f"Error during user validation for {user_id}: {e}")
         return None, "❌ An unexpected error occurred during validation."
 
+class NicknameIndex:
+    """
+    Case-folded index of one guild's nicknames, display names and linked Torn IDs.
+    Built once on ready and kept current from member events, so duplicate checks are O(1).
+    """
+    def __init__(self):
+        self.names: Dict[str, Set[int]] = {}
+        self.torn_ids: Dict[str, Set[int]] = {}
+        self._member_keys: Dict[int, Tuple[Tuple[str, ...], Optional[str]]] = {}
+
+    @staticmethod
+    def _keys_for(member: discord.Member) -> Tuple[Tuple[str, ...], Optional[str]]:
+        names = {member.display_name.casefold()}
+        if member.nick:
+            names.add(member.nick.casefold())
+        return tuple(names), parse_torn_id(member.nick)
+
+    def add(self, member: discord.Member):
+        self.remove(member.id)
+        names, torn_id = self._keys_for(member)
+        self._member_keys[member.id] = (names, torn_id)
+        for name in names:
+            self.names.setdefault(name, set()).add(member.id)
+        if torn_id:
+            self.torn_ids.setdefault(torn_id, set()).add(member.id)
+
+    def remove(self, member_id: int):
+        keys = self._member_keys.pop(member_id, None)
+        if not keys:
+            return
+        names, torn_id = keys
+        for name in names:
+            self._discard(self.names, name, member_id)
+        if torn_id:
+            self._discard(self.torn_ids, torn_id, member_id)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], key: str, member_id: int):
+        member_ids = index.get(key)
+        if member_ids is not None:
+            member_ids.discard(member_id)
+            if not member_ids:
+                del index[key]
+
+    def find_name(self, name: str, exclude_id: Optional[int] = None) -> Optional[int]:
+        """Returns the ID of another member using this nickname or display name."""
+        return next((member_id for member_id in self.names.get(name.casefold(), ()) if member_id != exclude_id), None)
+
+    def find_torn_id(self, torn_id: str, exclude_id: Optional[int] = None) -> Optional[int]:
+        """Returns the ID of another member whose nickname claims this Torn ID."""
+        return next((member_id for member_id in self.torn_ids.get(torn_id, ()) if member_id != exclude_id), None)
+
+    def members_for_torn_id(self, torn_id: str) -> Set[int]:
+        return self.torn_ids.get(torn_id, set())
+
+def get_nickname_index(guild: discord.Guild) -> NicknameIndex:
+    """Returns the guild's nickname index, building it on first use."""
+    index = bot.nickname_indexes.get(guild.id)
+    if index is None:
+        index = NicknameIndex()
+        for member in guild.members:
+            index.add(member)
+        bot.nickname_indexes[guild.id] = index
+    return index
+
+def build_nickname_indexes():
+    """(Re)builds the nickname index of every guild."""
+    bot.nickname_indexes = {}
+    for guild in bot.guilds:
+        get_nickname_index(guild)
+    logger.info(f"Built nickname indexes for {len(bot.nickname_indexes)} guilds.")
+
 def check_duplicate_nickname(guild: discord.Guild, new_nickname: str, current_user_id: int) -> Tuple[bool, Optional[discord.Member]]:
     """
     Check if the nickname already exists in the server
     Returns (is_duplicate, existing_member)
     """
-    for member in guild.members:
-        # Skip the current user (they can keep their own nickname)
-        if member.id == current_user_id:
-            continue
-            
-        # Check if any other member has the same nickname
-        if member.nick and member.nick.lower() == new_nickname.lower():
-            return True, member
-            
-        # Also check display name in case they don't have a nickname set
-        if member.display_name.lower() == new_nickname.lower():
-            return True, member
-    
-    return False, None
+    # The current user is skipped, they can keep their own nickname
+    existing_id = get_nickname_index(guild).find_name(new_nickname, exclude_id=current_user_id)
+    existing_member = guild.get_member(existing_id) if existing_id else None
+    return existing_member is not None, existing_member
+
+def check_duplicate_torn_id(guild: discord.Guild, torn_id: str, current_user_id: int) -> Tuple[bool, Optional[discord.Member]]:
+    """
+    Check if another member's nickname already claims this Torn ID
+    Returns (is_duplicate, existing_member)
+    """
+    existing_id = get_nickname_index(guild).find_torn_id(torn_id, exclude_id=current_user_id)
+    existing_member = guild.get_member(existing_id) if existing_id else None
+    return existing_member is not None, existing_member
 
 async def get_user_faction(user_id: str) -> Tuple[Optional[int], bool]:
     """
@@ -556,50 +1869,50 @@ async def get_user_faction(user_id: str) -> Tuple[Optional[int], bool]:
     - api_success: True if API call succeeded, False if there was an error
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://api.torn.com/user/{user_id}?selections=profile&key={torn_api_key}"
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to get user data for {user_id}. Status: {response.status}")
-                    return None, False
-                
-                data = await response.json()
-                
-                if 'error' in data:
-                    # Don't log "User not found" as an error, it's expected for old IDs
-                    if data['error']['code'] != 2:
-                         logger.error(f"Torn API error for user {user_id}: {data['error']['error']}")
-                    return None, False
-                
-                faction_info = data.get('faction', {})
-                faction_id = faction_info.get('faction_id')
-                # If we got valid data, api_success is True, even if user has no faction
-                return (int(faction_id) if faction_id and faction_id != 0 else None), True
-                
+        data = await bot.torn.get_user_profile(user_id)
+        if data is None:
+            logger.error(f"Failed to get user data for {user_id}.", extra={"sample": "user_lookup_failed"})
+            return None, False
+
+        if 'error' in data:
+            # Don't log "User not found" as an error, it's expected for old IDs
+            if data['error']['code'] not in TORN_USER_NOT_FOUND_CODES:
+                 logger.error(f"Torn API error for user {user_id}: {data['error']['error']}", extra={"sample": "user_lookup_error"})
+            return None, False
+
+        faction_info = data.get('faction', {})
+        faction_id = faction_info.get('faction_id')
+        # If we got valid data, api_success is True, even if user has no faction
+        return (int(faction_id) if faction_id and faction_id != 0 else None), True
+
     except Exception as e:
-        logger.error(f"Error getting user faction for {user_id}: {e}")
+        logger.error(f"Error getting user faction for {user_id}: {e}", extra={"sample": "user_lookup_exception"})
         return None, False
 
 class ChainButton(Button):
     def __init__(self, style: discord.ButtonStyle, label: str, is_join: bool):
-        super().__init__(style=style, label=label)
+        # A fixed custom_id keeps the view persistent, so it can be re-registered after a restart
+        super().__init__(style=style, label=label, custom_id="chain_join" if is_join else "chain_skip")
         self.is_join = is_join
         
     async def callback(self, interaction: discord.Interaction):
         assert self.view is not None
         view: ChainView = self.view
         
+        view.set_participant(interaction.user.id, interaction.user.display_name, self.is_join)
         if self.is_join:
-            view.joiners.add((interaction.user.id, interaction.user.display_name))
-            view.cant_make_it.discard((interaction.user.id, interaction.user.display_name))
             await interaction.response.send_message("You've joined the chain!", ephemeral=True)
         else:
-            view.cant_make_it.add((interaction.user.id, interaction.user.display_name))
-            view.joiners.discard((interaction.user.id, interaction.user.display_name))
             await interaction.response.send_message("You've indicated you can't make it.", ephemeral=True)
+        observe_interaction_ack(interaction, self.custom_id)
         
-        # Save the updated state
-        await save_active_chains()
+        # Queue the updated state (a single participant row) for the next coalesced write
+        chain_info = view.bot.active_chains.get(interaction.channel.id)
+        if chain_info and chain_info['view'] is view:
+            view.bot.chain_writer.set_participant(
+                chain_info['message_id'], interaction.user.id, interaction.user.display_name, self.is_join
+            )
+            request_chain_update(interaction.channel.id, chain_info)
 
 class CancelButton(Button):
     def __init__(self):
@@ -623,7 +1936,9 @@ class CancelButton(Button):
         # Cancel the chain
         channel_id = interaction.channel.id
         if channel_id in view.bot.active_chains:
-            del view.bot.active_chains[channel_id]
+            chain_info = view.bot.active_chains.pop(channel_id)
+            message_id = chain_info['message_id']
+            cancel_chain_deadlines(chain_info)
             
             # Disable all buttons
             view.disable_all_buttons()
@@ -634,10 +1949,12 @@ class CancelButton(Button):
                 description=f"Chain was cancelled by {interaction.user.name}",
                 color=discord.Color.red()
             )
-            await interaction.message.edit(embed=cancel_embed, view=view)
+            view.bot.edit_dispatcher.submit(interaction.message, embed=cancel_embed, view=view)
             
             await interaction.response.send_message("Chain has been cancelled!", ephemeral=True)
-            await save_active_chains()
+            observe_interaction_ack(interaction, self.custom_id)
+            view.bot.chain_writer.discard(message_id)
+            await view.bot.chain_store.delete_chain(channel_id, message_id)
         else:
             await interaction.response.send_message(
                 "This chain has already ended or been cancelled.",
@@ -651,6 +1968,8 @@ class ChainView(View):
         self.joiners: Set[Tuple[int, str]] = set()
         self.cant_make_it: Set[Tuple[int, str]] = set()
         self.chain_data = chain_data
+        self.version = 0  # bumped on every state change, used to reuse rendered participant lists
+        self._rendered_lists: Optional[Tuple[int, Tuple[str, str]]] = None
         
         # Add the buttons
         self.join_button = ChainButton(
@@ -669,151 +1988,276 @@ class ChainView(View):
         self.add_item(self.skip_button)
         self.add_item(self.cancel_button)
     
+    def set_participant(self, user_id: int, display_name: str, is_joining: bool):
+        """Records a member's answer, replacing any earlier answer (even under an older display name)."""
+        self.joiners = {entry for entry in self.joiners if entry[0] != user_id}
+        self.cant_make_it = {entry for entry in self.cant_make_it if entry[0] != user_id}
+        (self.joiners if is_joining else self.cant_make_it).add((user_id, display_name))
+        self.version += 1
+
+    def render_participant_lists(self) -> Tuple[str, str]:
+        """
+        Returns the (participants, can't make it) field texts.
+        They are only re-rendered after the view's state changed.
+        """
+        if self._rendered_lists is None or self._rendered_lists[0] != self.version:
+            self._rendered_lists = (self.version, (
+                format_name_list(self.joiners, "*No participants yet*"),
+                format_name_list(self.cant_make_it, "*None*")
+            ))
+        return self._rendered_lists[1]
+
     def disable_all_buttons(self):
         """Disable all buttons in the view"""
         self.join_button.disabled = True
         self.skip_button.disabled = True
         self.cancel_button.disabled = True
+        self.version += 1
+
+
+def format_name_list(entries: Set[Tuple[int, str]], empty_text: str) -> str:
+    """Formats (user_id, name) entries as a sorted bullet list that fits in an embed field."""
+    if not entries:
+        return empty_text
+    names = sorted((name for _, name in entries), key=str.casefold)
+    lines = []
+    length = 0
+    for i, name in enumerate(names):
+        line = f"• {name}"
+        more = f"…and {len(names) - i} more"
+        if length + len(line) + 1 > EMBED_FIELD_LIMIT - len(more) - 1:
+            lines.append(more)
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+def build_chain_embed(view: "ChainView", end_time_utc: datetime, timestamp: int, organizer_name: str) -> discord.Embed:
+    """
+    Builds the 'Upcoming Chain' embed.
+    The countdown is a Discord relative timestamp that ticks on the client, so the embed
+    only changes when the participants (or the Today/Tomorrow label) change.
+    """
+    embed = discord.Embed(
+        title="🔄 Upcoming Chain",
+        description="A new chain is being organized! Click the buttons below to indicate your participation:",
+        color=discord.Color.gold()
+    )
 
+    # Format the chain start time field differently based on whether it's today/tomorrow or a future date
+    now_utc = datetime.now(timezone.utc)
+    if end_time_utc.date() == now_utc.date():
+        time_str = "Today"
+    elif end_time_utc.date() == (now_utc + timedelta(days=1)).date():
+        time_str = "Tomorrow"
+    else:
+        time_str = end_time_utc.strftime("%d.%m.%Y")
 
-async def manage_chain_lifecycle(channel_id: int):
-    """Manages the lifecycle of a chain countdown in the background."""
-    chain_info = bot.active_chains.get(channel_id)
-    if not chain_info:
-        logging.warning(f"manage_chain_lifecycle called for channel {channel_id} but no active chain found.")
-        return
+    embed.add_field(
+        name="Chain Start Time",
+        value=f"Countdown: <t:{timestamp}:R>\n" +
+              f"Date: {time_str}\n" +
+              f"Time: {end_time_utc.strftime('%H:%M')} TC\n" +
+              f"Your local time: <t:{timestamp}:F>",
+        inline=False
+    )
+
+    joiners_text, cant_make_it_text = view.render_participant_lists()
+    embed.add_field(
+        name=f"Participants ({len(view.joiners)})",
+        value=joiners_text,
+        inline=False
+    )
+
+    embed.add_field(
+        name=f"Can't Make It ({len(view.cant_make_it)})",
+        value=cant_make_it_text,
+        inline=False
+    )
+
+    embed.add_field(
+        name="Options",
+        value="🟢 = I'll join the chain!\n🔴 = Can't make it",
+        inline=False
+    )
+
+    embed.set_footer(text=f"Chain organized by {organizer_name}")
+    return embed
+
+def hash_message_payload(embed: discord.Embed, view: Optional[View] = None) -> str:
+    """Hashes what a message edit would send, so identical edits can be skipped."""
+    payload = {
+        'embed': embed.to_dict(),
+        'components': view.to_components() if view else None
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
 
+def get_chain_message(channel_id: int, chain_info: Dict) -> Optional[discord.PartialMessage]:
+    """Returns a handle to the chain message that can be edited without fetching it first."""
     channel = bot.get_channel(channel_id)
     if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+        return None
+    return channel.get_partial_message(chain_info['message_id'])
+
+def is_current_chain(channel_id: int, chain_info: Dict) -> bool:
+    """True while chain_info is still the active chain in its channel (not cancelled or replaced)."""
+    return bot.active_chains.get(channel_id) is chain_info
+
+def cancel_chain_deadlines(chain_info: Dict, kinds: Optional[Tuple[str, ...]] = None):
+    """Removes the chain's pending scheduler deadlines of the given kinds, or all of them."""
+    kept = []
+    for deadline in chain_info.get('deadlines', []):
+        if kinds is None or deadline.name.rsplit(" ", 1)[-1] in kinds:
+            bot.scheduler.cancel(deadline)
+        elif not deadline.done:
+            kept.append(deadline)
+    chain_info['deadlines'] = kept
+
+def schedule_chain_deadline(channel_id: int, chain_info: Dict, when: datetime, kind: str, handler):
+    """Schedules one of a chain's deadlines on the shared scheduler."""
+    deadline = bot.scheduler.schedule(
+        when.timestamp(),
+        f"chain {channel_id} {kind}",
+        lambda: handler(channel_id, chain_info)
+    )
+    chain_info.setdefault('deadlines', []).append(deadline)
+
+async def render_chain_message(channel_id: int, chain_info: Dict):
+    """Edits the chain message, unless the rendered payload is identical to the last one sent."""
+    if chain_info.get('started'):
+        return  # the "Chain Starting!" message is final
+    chain_message = get_chain_message(channel_id, chain_info)
+    if chain_message is None:
         logging.error(f"Could not find channel or invalid channel type for ID {channel_id}.")
-        if channel_id in bot.active_chains:
-            del bot.active_chains[channel_id]
-        return
-        
-    try:
-        chain_message = await channel.fetch_message(chain_info['message_id'])
-    except (discord.NotFound, discord.Forbidden):
-        logging.error(f"Could not fetch message {chain_info['message_id']} in channel {channel_id}.")
-        if channel_id in bot.active_chains:
-            del bot.active_chains[channel_id]
+        await end_chain(channel_id, chain_info)
         return
 
     view = chain_info['view']
-    end_time_utc = chain_info['end_time_utc']
-    timestamp = chain_info['timestamp']
-    organizer_name = chain_info['organizer']
-    
+    embed = build_chain_embed(view, chain_info['end_time_utc'], chain_info['timestamp'], chain_info['organizer'])
+    payload_hash = hash_message_payload(embed, view)
+    if payload_hash == chain_info.get('payload_hash'):
+        return
+
     try:
-        while datetime.now(timezone.utc) < end_time_utc:
-            if channel_id not in bot.active_chains:
-                logging.info(f"Chain in channel {channel_id} was cancelled. Stopping countdown.")
-                return
+        await bot.edit_dispatcher.edit(chain_message, embed=embed, view=view)
+        chain_info['payload_hash'] = payload_hash
+    except discord.NotFound:
+        logging.warning(f"Chain message {chain_info['message_id']} not found during update. Stopping chain.")
+        await end_chain(channel_id, chain_info)
+
+async def refresh_chain_message(channel_id: int, chain_info: Dict):
+    """Refresh tick: re-renders the chain message and schedules the next tick."""
+    if not is_current_chain(channel_id, chain_info):
+        return
 
-            await asyncio.sleep(25)
-            
-            remaining = (end_time_utc - datetime.now(timezone.utc)).total_seconds()
-            if remaining < 0:
-                remaining = 0
-            
-            embed = discord.Embed(
-                title="🔄 Upcoming Chain",
-                description="A new chain is being organized! Click the buttons below to indicate your participation:",
-                color=discord.Color.gold()
-            )
-            
-            # Format the chain start time field differently based on whether it's today/tomorrow or a future date
-            now_utc = datetime.now(timezone.utc)
-            if end_time_utc.date() == now_utc.date():
-                time_str = "Today"
-            elif end_time_utc.date() == (now_utc + timedelta(days=1)).date():
-                time_str = "Tomorrow"
-            else:
-                time_str = end_time_utc.strftime("%d.%m.%Y")
-            
-            embed.add_field(
-                name="Chain Start Time",
-                value=f"Countdown: {format_time_remaining(int(remaining))}\n" +
-                      f"Date: {time_str}\n" +
-                      f"Time: {end_time_utc.strftime('%H:%M')} TC\n" +
-                      f"Your local time: <t:{timestamp}:F>",
-                inline=False
-            )
-            
-            joiners_text = "\n".join([f"• {name}" for _, name in view.joiners]) if view.joiners else "*No participants yet*"
-            embed.add_field(
-                name=f"Participants ({len(view.joiners)})",
-                value=joiners_text,
-                inline=False
-            )
-            
-            cant_make_it_text = "\n".join([f"• {name}" for _, name in view.cant_make_it]) if view.cant_make_it else "*None*"
-            embed.add_field(
-                name=f"Can't Make It ({len(view.cant_make_it)})",
-                value=cant_make_it_text,
-                inline=False
-            )
-            
-            embed.add_field(
-                name="Options",
-                value="🟢 = I'll join the chain!\n🔴 = Can't make it",
-                inline=False
-            )
-            
-            embed.set_footer(text=f"Chain organized by {organizer_name}")
-            
-            try:
-                await chain_message.edit(embed=embed, view=view)
-            except discord.NotFound:
-                logging.warning(f"Chain message {chain_info['message_id']} not found during update. Stopping task.")
-                break
-            
-            if remaining <= 0:
-                break
-        
-        if channel_id not in bot.active_chains:
-             logging.info(f"Chain in channel {channel_id} was cancelled or ended prematurely before starting.")
-             return
+    chain_info['deadlines'] = [deadline for deadline in chain_info.get('deadlines', []) if not deadline.done]
+    next_refresh = datetime.now(timezone.utc) + timedelta(seconds=CHAIN_REFRESH_INTERVAL)
+    if next_refresh < chain_info['end_time_utc']:
+        schedule_chain_deadline(channel_id, chain_info, next_refresh, "refresh", refresh_chain_message)
+
+    await render_chain_message(channel_id, chain_info)
+
+async def update_chain_message(channel_id: int, chain_info: Dict):
+    """Debounced update after participants changed."""
+    chain_info['update_pending'] = False
+    if is_current_chain(channel_id, chain_info) and not chain_info.get('started'):
+        await render_chain_message(channel_id, chain_info)
+
+def request_chain_update(channel_id: int, chain_info: Dict):
+    """Schedules one message update shortly after a click, however many clicks arrive in between."""
+    if chain_info.get('update_pending'):
+        return
+    chain_info['update_pending'] = True
+    when = datetime.now(timezone.utc) + timedelta(seconds=CHAIN_UPDATE_DEBOUNCE)
+    schedule_chain_deadline(channel_id, chain_info, when, "update", update_chain_message)
+
+async def start_chain(channel_id: int, chain_info: Dict):
+    """Start deadline: announces the chain and closes the sign-up message."""
+    if not is_current_chain(channel_id, chain_info):
+        logging.info(f"Chain in channel {channel_id} was cancelled or ended prematurely before starting.")
+        return
+
+    # From here on the sign-up message must not be re-rendered, or a late click would overwrite the final embed
+    chain_info['started'] = True
+    cancel_chain_deadlines(chain_info, ("update", "refresh"))
+
+    channel = bot.get_channel(channel_id)
+    chain_message = get_chain_message(channel_id, chain_info)
+    if chain_message is None:
+        logging.error(f"Could not find channel or invalid channel type for ID {channel_id}.")
+        return
 
+    view = chain_info['view']
+    try:
         final_embed = discord.Embed(
             title="🎯 Chain Starting!",
             description="Time's up! The chain is starting now!",
             color=discord.Color.green()
         )
-        
-        joiners_text = "\n".join([f"• {name}" for _, name in view.joiners]) if view.joiners else "*No participants*"
+
+        joiners_text = format_name_list(view.joiners, "*No participants*")
         final_embed.add_field(
             name=f"Final Participants ({len(view.joiners)})",
             value=joiners_text,
             inline=False
         )
-        
+
         if view.joiners:
             mentions = [f"<@{user_id}>" for user_id, _ in view.joiners]
             mentions_text = " ".join(mentions)
             await channel.send(f"🔔 @everyone Chain is starting! {mentions_text}")
-        
+
         view.disable_all_buttons()
-        await chain_message.edit(embed=final_embed, view=view)
-        
+        await bot.edit_dispatcher.edit(chain_message, embed=final_embed, view=view)
+
     except Exception as e:
         logging.error(f"Chain lifecycle management error: {e}")
         try:
             await channel.send("An error occurred while managing the chain.")
         except discord.Forbidden:
             logging.error(f"Could not send error message to channel {channel_id}.")
-    finally:
-        if channel_id in bot.active_chains:
-            del bot.active_chains[channel_id]
-        await save_active_chains()
 
-@bot.tree.command(name="chain", description="Organize a chain with a countdown timer")
-@app_commands.describe(
-    time_str="Time until chain starts: '5h', '30m', '18:00TC', or '18:00TC at DD.MM.YYYY' (e.g., '18:00TC at 25.12.2024')"
-)
-@app_commands.guild_only()
-async def chain(interaction: discord.Interaction, time_str: str):
+async def end_chain(channel_id: int, chain_info: Dict):
+    """Cleanup deadline: forgets the chain and removes it from the chain store."""
+    cancel_chain_deadlines(chain_info)
+    if is_current_chain(channel_id, chain_info):
+        del bot.active_chains[channel_id]
+    bot.chain_writer.discard(chain_info['message_id'])
+    await bot.chain_store.delete_chain(channel_id, chain_info['message_id'])
+
+def manage_chain_lifecycle(channel_id: int):
+    """
+    Registers a chain's deadlines (refresh ticks, start time, cleanup) with the shared scheduler.
+    The start fires exactly at end_time_utc rather than on the next polling tick.
+    """
+    chain_info = bot.active_chains.get(channel_id)
+    if not chain_info:
+        logging.warning(f"manage_chain_lifecycle called for channel {channel_id} but no active chain found.")
+        return
+
+    if get_chain_message(channel_id, chain_info) is None:
+        logging.error(f"Could not find channel or invalid channel type for ID {channel_id}.")
+        del bot.active_chains[channel_id]
+        return
+
+    end_time_utc = chain_info['end_time_utc']
+    next_refresh = datetime.now(timezone.utc) + timedelta(seconds=CHAIN_REFRESH_INTERVAL)
+    if next_refresh < end_time_utc:
+        schedule_chain_deadline(channel_id, chain_info, next_refresh, "refresh", refresh_chain_message)
+    schedule_chain_deadline(channel_id, chain_info, end_time_utc, "start", start_chain)
+    schedule_chain_deadline(channel_id, chain_info, end_time_utc + timedelta(seconds=CHAIN_CLEANUP_DELAY), "cleanup", end_chain)
+    retune_chain_status_poll()  # poll closely around the countdown's end
+    metrics.inc("chain_lifecycles_scheduled_total")
+
+@bot.tree.command(name="chain", description="Organize a chain with a countdown timer")
+@app_commands.describe(
+    time_str="Time until chain starts: '5h', '30m', '18:00TC', or '18:00TC at DD.MM.YYYY' (e.g., '18:00TC at 25.12.2024')"
+)
+@app_commands.guild_only()
+async def chain(interaction: discord.Interaction, time_str: str):
     # Defer the response immediately to prevent timeout
     await interaction.response.defer()
+    observe_interaction_ack(interaction)
 
     if not isinstance(interaction.channel, (discord.TextChannel, discord.Thread)):
         await interaction.followup.send(
@@ -843,49 +2287,12 @@ async def chain(interaction: discord.Interaction, time_str: str):
     
     timestamp = int(end_time_utc.timestamp())
     
-    embed = discord.Embed(
-        title="🔄 Upcoming Chain",
-        description="A new chain is being organized! Click the buttons below to indicate your participation:",
-        color=discord.Color.gold()
-    )
-    
-    # Format the chain start time field differently based on whether it's today/tomorrow or a future date
-    now_utc = datetime.now(timezone.utc)
-    if end_time_utc.date() == now_utc.date():
-        time_str = "Today"
-    elif end_time_utc.date() == (now_utc + timedelta(days=1)).date():
-        time_str = "Tomorrow"
-    else:
-        time_str = end_time_utc.strftime("%d.%m.%Y")
-    
-    embed.add_field(
-        name="Chain Start Time",
-        value=f"Countdown: {format_time_remaining(seconds)}\n" +
-              f"Date: {time_str}\n" +
-              f"Time: {end_time_utc.strftime('%H:%M')} TC\n" +
-              f"Your local time: <t:{timestamp}:F>",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="Participants",
-        value="*No participants yet*",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="Options",
-        value="🟢 = I'll join the chain!\n🔴 = Can't make it",
-        inline=False
-    )
-    
-    embed.set_footer(text=f"Chain organized by {interaction.user.name}")
-    
     chain_data = {
         'organizer': interaction.user.name
     }
     
     view = ChainView(bot, chain_data)
+    embed = build_chain_embed(view, end_time_utc, timestamp, interaction.user.name)
     await interaction.followup.send(embed=embed, view=view)
     chain_message = await interaction.original_response()
     
@@ -894,76 +2301,370 @@ async def chain(interaction: discord.Interaction, time_str: str):
         'end_time_utc': end_time_utc,
         'timestamp': timestamp,
         'organizer': interaction.user.name,
-        'view': view
+        'view': view,
+        'payload_hash': hash_message_payload(embed, view)
     }
     
-    await save_active_chains()
-    asyncio.create_task(manage_chain_lifecycle(interaction.channel.id))
+    await bot.chain_store.save_chain(interaction.channel.id, bot.active_chains[interaction.channel.id])
+    manage_chain_lifecycle(interaction.channel.id)
     logger.info(f"Chain started in channel {interaction.channel.id} by {interaction.user.name}")
 
  
 
-async def get_chain_leaderboard(faction_id: str = "53180") -> Optional[Dict]:
+async def get_chain_leaderboard(faction_id: str = "53180", priority: int = PRIORITY_POLL,
+                                from_timestamp: Optional[int] = None) -> Optional[Dict]:
     """
     Get current chain leaderboard data from Torn API
+    With from_timestamp, the log only needs to contain hits from that time on.
     Returns chain data or None if failed
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://api.torn.com/faction/{faction_id}?selections=chain&key={torn_api_key}"
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return None
-                
-                data = await response.json()
-                
-                if 'error' in data:
-                    logging.error(f"Chain API Error: {data['error']['error']}")
-                    return None
-                
-                return data.get("chain", {})
-                
+        data = await bot.torn.get_faction_chain(faction_id, priority=priority, from_timestamp=from_timestamp)
+        if data is None:
+            return None
+
+        if 'error' in data:
+            logging.error(f"Chain API Error: {data['error']['error']}")
+            return None
+
+        return data.get("chain", {})
+
     except Exception as e:
         logging.error(f"Chain leaderboard error: {e}")
         return None
 
-def process_chain_data(chain_data: Dict) -> Tuple[Dict, int, bool]:
+def get_hit_timestamp(hit: Dict) -> int:
+    """Returns when a chain hit happened, or 0 if the log entry has no timestamp."""
+    return int(hit.get("timestamp_ended") or hit.get("timestamp") or 0)
+
+class ChainAggregator:
     """
-    Process chain data and return leaderboard, current hits, and if chain is active
-    Returns (leaderboard_dict, current_hits, is_active)
+    Stateful per-attacker chain leaderboard.
+    It remembers which hits it already counted and the newest hit timestamp (the watermark),
+    so each poll only folds in new log entries and can ask the API for hits since the watermark.
     """
-    chain_log = chain_data.get("log", {})
-    current_hits = chain_data.get("current", 0)
-    
-    # Check if chain is active (has recent activity)
-    is_active = current_hits > 0
-    
-    if not chain_log:
-        return {}, current_hits, is_active
-    
-    # Aggregate hits per player
-    leaderboard = {}
-    
-    for hit in chain_log.values():
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.leaderboard: Dict[str, Dict[str, int]] = {}
+        self.current_hits = 0
+        self.chain_start = 0
+        self.watermark = 0  # newest hit timestamp folded in
+        self.total_hits = 0
+        self._seen: Dict[str, int] = {}  # hit ID -> timestamp, for hits at or after the watermark
+
+    def fold(self, chain_data: Dict) -> List[Dict]:
+        """
+        Folds a chain payload into the leaderboard.
+        Returns the log entries that had not been counted before.
+        """
+        current_hits = chain_data.get("current", 0)
+        chain_start = chain_data.get("start", 0) or 0
+        # A different start time or a lower hit count means a new chain
+        if (chain_start and self.chain_start and chain_start != self.chain_start) or current_hits < self.current_hits:
+            self.reset()
+        self.current_hits = current_hits
+        self.chain_start = chain_start or self.chain_start
+
+        new_hits = []
+        watermark = self.watermark
+        for hit_id, hit in (chain_data.get("log") or {}).items():
+            timestamp = get_hit_timestamp(hit)
+            if (timestamp and timestamp < self.watermark) or hit_id in self._seen:
+                continue  # already counted
+            self._seen[hit_id] = timestamp
+            watermark = max(watermark, timestamp)
+            self._count(hit)
+            new_hits.append(hit)
+
+        if watermark > self.watermark:
+            self.watermark = watermark
+            # Hits older than the watermark are filtered by timestamp, no need to remember their IDs
+            self._seen = {hit_id: timestamp for hit_id, timestamp in self._seen.items()
+                          if not timestamp or timestamp >= watermark}
+        return new_hits
+
+    def _count(self, hit: Dict):
         attacker = hit.get("initiator_name", "Unknown")
         result = hit.get("result", "").lower()
-        
-        if attacker not in leaderboard:
-            leaderboard[attacker] = {"hits": 0, "mugs": 0, "leaves": 0, "others": 0}
-        
-        leaderboard[attacker]["hits"] += 1
-        
+
+        stats = self.leaderboard.get(attacker)
+        if stats is None:
+            stats = self.leaderboard[attacker] = {"hits": 0, "mugs": 0, "leaves": 0, "others": 0}
+
+        stats["hits"] += 1
+        self.total_hits += 1
+
         if "mug" in result:
-            leaderboard[attacker]["mugs"] += 1
+            stats["mugs"] += 1
         elif "leave" in result:
-            leaderboard[attacker]["leaves"] += 1
+            stats["leaves"] += 1
         else:
-            leaderboard[attacker]["others"] += 1
-    
-    return leaderboard, current_hits, is_active
+            stats["others"] += 1
 
-def create_leaderboard_embed(leaderboard: Dict, current_hits: int, is_final: bool = False) -> discord.Embed:
-    """Create Discord embed for chain leaderboard"""
+def process_chain_data(chain_data: Dict, aggregator: Optional[ChainAggregator] = None) -> Tuple[Dict, int, bool]:
+    """
+    Process chain data and return leaderboard, current hits, and if chain is active
+    With an aggregator, only hits it hasn't seen yet are processed and its running totals are returned.
+    Returns (leaderboard_dict, current_hits, is_active)
+    """
+    if aggregator is None:
+        aggregator = ChainAggregator()
+    aggregator.fold(chain_data)
+
+    # Check if chain is active (has recent activity)
+    is_active = aggregator.current_hits > 0
+    return aggregator.leaderboard, aggregator.current_hits, is_active
+
+class ChainSnapshot:
+    """The state of a faction's chain as of one poll."""
+    def __init__(self, chain_data: Dict, aggregator: ChainAggregator, new_hits: List[Dict]):
+        self.chain = {key: value for key, value in chain_data.items() if key != "log"}
+        self.current_hits = aggregator.current_hits
+        self.is_active = aggregator.current_hits > 0
+        self.leaderboard = {name: dict(stats) for name, stats in aggregator.leaderboard.items()}
+        self.new_hits = new_hits
+        self.fetched_at = time.time()
+        self._ranking: Optional[List[Tuple[str, Dict[str, int]]]] = None
+
+    @property
+    def ranking(self) -> List[Tuple[str, Dict[str, int]]]:
+        """The full leaderboard ordered by hits, sorted once per snapshot and shared by every page."""
+        if self._ranking is None:
+            self._ranking = rank_leaderboard(self.leaderboard)
+        return self._ranking
+
+    @property
+    def age(self) -> float:
+        """Seconds since this snapshot was fetched."""
+        return time.time() - self.fetched_at
+
+class ChainSubscription:
+    """A consumer of a ChainFeed, receiving the latest snapshot after every poll."""
+    def __init__(self, feed: "ChainFeed", interval: float):
+        self.feed = feed
+        self.interval = interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    def set_interval(self, interval: float):
+        """Changes how often this subscriber wants fresh data."""
+        self.interval = interval
+        self.feed.wakeup()
+
+    async def next(self) -> ChainSnapshot:
+        """Waits for the next published snapshot."""
+        return await self.queue.get()
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+class ChainFeed:
+    """
+    Shared chain poller for one faction.
+    A single poll loop runs as fast as its most demanding subscriber needs and publishes each
+    snapshot to all of them; on-demand reads are served from a fresh-enough snapshot, and
+    concurrent refreshes share one in-flight request.
+    """
+    def __init__(self, faction_id: str):
+        self.faction_id = faction_id
+        self.aggregator = ChainAggregator()
+        self.snapshot: Optional[ChainSnapshot] = None
+        self.fetches = 0
+        self._subscriptions: List[ChainSubscription] = []
+        self._hit_listeners = []  # called with each snapshot's new hits
+        self._refreshing: Optional[asyncio.Task] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._last_attempt = 0.0
+        self._wakeup = asyncio.Event()
+
+    def subscribe(self, interval: float) -> ChainSubscription:
+        """Registers a consumer that wants a snapshot at least every `interval` seconds."""
+        subscription = ChainSubscription(self, interval)
+        self._subscriptions.append(subscription)
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        self.wakeup()
+        return subscription
+
+    def add_hit_listener(self, listener):
+        """Registers `listener(new_hits)`, called with the hits each poll adds, for incremental aggregation."""
+        self._hit_listeners.append(listener)
+
+    def unsubscribe(self, subscription: ChainSubscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        self.wakeup()
+
+    def wakeup(self):
+        self._wakeup.set()
+
+    async def get(self, max_age: float, priority: int = PRIORITY_POLL) -> Optional[ChainSnapshot]:
+        """Returns the latest snapshot if it is at most `max_age` seconds old, otherwise refreshes."""
+        if self.snapshot and self.snapshot.age <= max_age:
+            return self.snapshot
+        return await self.refresh(priority)
+
+    async def refresh(self, priority: int = PRIORITY_POLL) -> Optional[ChainSnapshot]:
+        """Fetches a new snapshot, joining the refresh already in flight if there is one."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._fetch(priority))
+        return await asyncio.shield(self._refreshing)
+
+    async def _fetch(self, priority: int) -> Optional[ChainSnapshot]:
+        self._last_attempt = time.time()
+        chain_data = await get_chain_leaderboard(self.faction_id, priority=priority,
+                                                 from_timestamp=self.aggregator.watermark or None)
+        if not chain_data:
+            return None
+
+        self.fetches += 1
+        new_hits = self.aggregator.fold(chain_data)
+        self.snapshot = ChainSnapshot(chain_data, self.aggregator, new_hits)
+        if new_hits:
+            for listener in self._hit_listeners:
+                try:
+                    listener(new_hits)
+                except Exception as e:
+                    logger.error(f"Chain hit listener failed: {e}")
+        for subscription in self._subscriptions:
+            if subscription.queue.full():
+                subscription.queue.get_nowait()  # subscribers only care about the latest state
+            subscription.queue.put_nowait(self.snapshot)
+        return self.snapshot
+
+    async def _poll(self):
+        while self._subscriptions:
+            interval = min(subscription.interval for subscription in self._subscriptions)
+            last_update = max(self._last_attempt, self.snapshot.fetched_at if self.snapshot else 0)
+            delay = last_update + interval - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue  # intervals or subscribers may have changed, re-evaluate
+
+            try:
+                await self.refresh(PRIORITY_POLL)
+            except Exception as e:
+                logger.error(f"Chain feed refresh for faction {self.faction_id} failed: {e}")
+
+class ChainTimeoutWatchdog:
+    """
+    Projects a running chain's timeout forward from the last snapshot and schedules an alert
+    for each threshold in CHAIN_TIMEOUT_ALERTS. Every new snapshot re-syncs the projection.
+    """
+    def __init__(self, faction_id: str):
+        self.faction_id = faction_id
+        self.expires_at = 0.0  # projected epoch time the chain breaks
+        self.current_hits = 0
+        self.alerted: Set[int] = set()  # thresholds already alerted for the current timeout
+        self._deadlines: List[ScheduledDeadline] = []
+
+    def sync(self, snapshot: ChainSnapshot):
+        """Re-projects the timeout from a fresh snapshot and reschedules the pending alerts."""
+        for deadline in self._deadlines:
+            bot.scheduler.cancel(deadline)
+        self._deadlines = []
+
+        timeout = snapshot.chain.get("timeout") or 0
+        if not snapshot.is_active or timeout <= 0:
+            self.expires_at = 0.0
+            self.alerted.clear()
+            return
+
+        self.expires_at = snapshot.fetched_at + timeout
+        self.current_hits = snapshot.current_hits
+        # A hit since the last alert pushed the timeout back up, so those thresholds can fire again
+        self.alerted = {threshold for threshold in self.alerted if threshold >= timeout}
+        now = time.time()
+        for threshold in CHAIN_TIMEOUT_ALERTS:
+            when = self.expires_at - threshold
+            if threshold in self.alerted or when <= now:
+                continue
+            self._deadlines.append(bot.scheduler.schedule(
+                when,
+                f"chain timeout alert {threshold}s",
+                lambda threshold=threshold, when=when: self.alert(threshold, when)
+            ))
+
+    async def alert(self, threshold: int, scheduled_for: float):
+        """Sends the alert for one threshold."""
+        self.alerted.add(threshold)
+        logger.info(f"Chain timeout alert for {threshold}s left fired {(time.time() - scheduled_for) * 1000:.0f}ms late.")
+
+        channel_id = bot.config.get("chain_notification_channel_id")
+        channel = bot.get_channel(channel_id) if channel_id else None
+        if not channel:
+            logger.warning("Chain is about to break, but no notification channel is set.", extra={"sample": "chain_alert_no_channel"})
+            return
+
+        urgency = "🚨" if threshold == CHAIN_TIMEOUT_ALERTS[-1] else "⚠️"
+        try:
+            await channel.send(
+                f"{urgency} @here The chain breaks <t:{int(self.expires_at)}:R> — "
+                f"hit now to keep **{self.current_hits}** hits alive!",
+                allowed_mentions=discord.AllowedMentions(everyone=True)
+            )
+        except discord.Forbidden:
+            logger.error(f"Missing permissions to send message in channel {channel_id}.")
+        except Exception as e:
+            logger.error(f"Failed to send chain timeout alert: {e}")
+
+def get_chain_poll_interval(snapshot: Optional[ChainSnapshot], idle_polls: int = 0) -> float:
+    """
+    Picks the delay until the next chain status poll.
+    While a chain runs, polls get tighter as its timeout approaches; while none runs, the delay doubles
+    with every idle poll, except when a /chain countdown is about to end.
+    """
+    if snapshot and snapshot.is_active:
+        interval = CHAIN_POLL_ACTIVE_INTERVAL
+        timeout = snapshot.chain.get("timeout") or 0
+        if timeout > 0:
+            interval = min(interval, timeout / 3)
+    else:
+        interval = CHAIN_POLL_FLOOR * 2 ** min(idle_polls, 16)
+        now = time.time()
+        for chain_info in bot.active_chains.values():
+            until_lead = chain_info['end_time_utc'].timestamp() - CHAIN_POLL_COUNTDOWN_LEAD - now
+            interval = min(interval, max(until_lead, 0))
+    return min(max(interval, CHAIN_POLL_FLOOR), CHAIN_POLL_CEILING)
+
+def retune_chain_status_poll(idle_polls: int = 0):
+    """Applies a freshly computed interval to the chain status checker's subscription."""
+    subscription = bot.chain_status_subscription
+    if subscription is None:
+        return
+    interval = get_chain_poll_interval(subscription.feed.snapshot, idle_polls)
+    if interval != subscription.interval:
+        subscription.set_interval(interval)
+
+def get_chain_feed(faction_id: str = "53180") -> ChainFeed:
+    """Returns the shared chain feed of a faction."""
+    feed = bot.chain_feeds.get(faction_id)
+    if feed is None:
+        feed = bot.chain_feeds[faction_id] = ChainFeed(faction_id)
+    return feed
+
+def rank_leaderboard(leaderboard: Dict, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, int]]]:
+    """
+    Orders leaderboard entries by total hits.
+    With a limit only the top entries are selected (a partial heap selection instead of a full sort).
+    """
+    by_hits = lambda entry: entry[1]["hits"]
+    if limit is not None:
+        return heapq.nlargest(limit, leaderboard.items(), key=by_hits)
+    return sorted(leaderboard.items(), key=by_hits, reverse=True)
+
+def create_leaderboard_embed(leaderboard: Dict, current_hits: int, is_final: bool = False,
+                             ranking: Optional[List[Tuple[str, Dict[str, int]]]] = None, page: int = 0) -> discord.Embed:
+    """
+    Create Discord embed for chain leaderboard
+    Without a precomputed ranking only the top LEADERBOARD_PAGE_SIZE participants are selected;
+    with one, the requested page of it is shown.
+    """
     title = "🔗 Final Chain Leaderboard" if is_final else f"🔗 Chain Leaderboard - {current_hits} hits"
     color = discord.Color.gold() if is_final else discord.Color.blue()
     
@@ -977,11 +2678,14 @@ def create_leaderboard_embed(leaderboard: Dict, current_hits: int, is_final: boo
         embed.description = "No chain data available yet."
         return embed
     
-    # Sort by total hits
-    sorted_leaderboard = sorted(leaderboard.items(), key=lambda x: x[1]["hits"], reverse=True)
-    
-    # Show top 10 players to avoid embed limits
-    for i, (name, stats) in enumerate(sorted_leaderboard[:10]):
+    # Show one page of players to avoid embed limits
+    offset = page * LEADERBOARD_PAGE_SIZE
+    if ranking is None:
+        entries = rank_leaderboard(leaderboard, LEADERBOARD_PAGE_SIZE)
+    else:
+        entries = ranking[offset:offset + LEADERBOARD_PAGE_SIZE]
+
+    for i, (name, stats) in enumerate(entries, start=offset):
         position = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else f"{i+1}."
         value = (
             f"🎯 Hits: `{stats['hits']}`\n"
@@ -991,11 +2695,52 @@ def create_leaderboard_embed(leaderboard: Dict, current_hits: int, is_final: boo
         )
         embed.add_field(name=f"{position} {name}", value=value, inline=True)
     
-    if len(sorted_leaderboard) > 10:
-        embed.set_footer(text=f"Showing top 10 of {len(sorted_leaderboard)} participants")
+    if ranking is not None and len(ranking) > LEADERBOARD_PAGE_SIZE:
+        page_count = (len(ranking) + LEADERBOARD_PAGE_SIZE - 1) // LEADERBOARD_PAGE_SIZE
+        embed.set_footer(text=f"Page {page + 1}/{page_count} • {len(ranking)} participants")
+    elif len(leaderboard) > LEADERBOARD_PAGE_SIZE:
+        embed.set_footer(text=f"Showing top {LEADERBOARD_PAGE_SIZE} of {len(leaderboard)} participants")
     
     return embed
 
+class LeaderboardPageButton(Button):
+    def __init__(self, label: str, step: int):
+        super().__init__(style=discord.ButtonStyle.secondary, label=label)
+        self.step = step
+
+    async def callback(self, interaction: discord.Interaction):
+        assert self.view is not None
+        view: LeaderboardView = self.view
+        view.page += self.step
+        await interaction.response.edit_message(embed=view.render(), view=view)
+        observe_interaction_ack(interaction, "leaderboard_page")
+
+class LeaderboardView(View):
+    """Prev/Next pages over one snapshot's ranking; paging never re-sorts or re-fetches."""
+    def __init__(self, snapshot: ChainSnapshot):
+        super().__init__(timeout=600)
+        self.snapshot = snapshot
+        self.page = 0
+        self.page_count = max((len(snapshot.ranking) + LEADERBOARD_PAGE_SIZE - 1) // LEADERBOARD_PAGE_SIZE, 1)
+        self.prev_button = LeaderboardPageButton("◀ Prev", -1)
+        self.next_button = LeaderboardPageButton("Next ▶", 1)
+        self.add_item(self.prev_button)
+        self.add_item(self.next_button)
+
+    def render(self) -> discord.Embed:
+        """Builds the embed for the current page and enables only the buttons that lead somewhere."""
+        self.page = min(max(self.page, 0), self.page_count - 1)
+        self.prev_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= self.page_count - 1
+
+        embed = create_leaderboard_embed(self.snapshot.leaderboard, self.snapshot.current_hits,
+                                         ranking=self.snapshot.ranking, page=self.page)
+        if not self.snapshot.is_active:
+            embed.description = "⚠️ No active chain found."
+        age_text = f"Data from {int(self.snapshot.age)}s ago"
+        embed.set_footer(text=f"{embed.footer.text} • {age_text}" if embed.footer.text else age_text)
+        return embed
+
 async def track_chain_progress(channel, initial_hits: int = 0):
     """
     Track chain progress and update leaderboard every 30 seconds
@@ -1007,24 +2752,24 @@ async def track_chain_progress(channel, initial_hits: int = 0):
     update_interval = 30  # 30 seconds
     
     leaderboard_message = None
+    snapshot = None
+    last_fetched_at = time.time()
+    subscription = get_chain_feed().subscribe(update_interval)
     
     try:
         while inactive_time < max_inactive_time:
-            await asyncio.sleep(update_interval)
-            
-            # Get current chain data
-            chain_data = await get_chain_leaderboard()
-            if not chain_data:
-                continue
-            
-            leaderboard, current_hits, is_active = process_chain_data(chain_data)
+            # Wait for the shared chain poller's next snapshot
+            snapshot = await subscription.next()
+            leaderboard, current_hits, is_active = snapshot.leaderboard, snapshot.current_hits, snapshot.is_active
             
             # Check if chain has new activity
             if current_hits > last_hits:
                 last_hits = current_hits
                 inactive_time = 0  # Reset inactive timer
             else:
-                inactive_time += update_interval
+                # The shared feed can deliver snapshots more often than update_interval, so count real time
+                inactive_time += max(snapshot.fetched_at - last_fetched_at, 0)
+            last_fetched_at = snapshot.fetched_at
             
             # Create/update leaderboard embed
             embed = create_leaderboard_embed(leaderboard, current_hits)
@@ -1035,7 +2780,7 @@ async def track_chain_progress(channel, initial_hits: int = 0):
             else:
                 # Update existing message
                 try:
-                    await leaderboard_message.edit(embed=embed)
+                    await bot.edit_dispatcher.edit(leaderboard_message, embed=embed)
                 except discord.NotFound:
                     # Message was deleted, send a new one
                     leaderboard_message = await channel.send(embed=embed)
@@ -1045,14 +2790,13 @@ async def track_chain_progress(channel, initial_hits: int = 0):
                 break
         
         # Send final leaderboard
-        if chain_data:
-            leaderboard, current_hits, _ = process_chain_data(chain_data)
-            final_embed = create_leaderboard_embed(leaderboard, current_hits, is_final=True)
+        if snapshot:
+            final_embed = create_leaderboard_embed(snapshot.leaderboard, snapshot.current_hits, is_final=True)
             final_embed.description = "🔒 Chain tracking ended - No activity for 5+ minutes"
             
             if leaderboard_message:
                 try:
-                    await leaderboard_message.edit(embed=final_embed)
+                    await bot.edit_dispatcher.edit(leaderboard_message, embed=final_embed)
                 except discord.NotFound:
                     await channel.send(embed=final_embed)
             else:
@@ -1067,55 +2811,68 @@ async def track_chain_progress(channel, initial_hits: int = 0):
                     description="An error occurred while tracking the chain.",
                     color=discord.Color.red()
                 )
-                await leaderboard_message.edit(embed=error_embed)
+                await bot.edit_dispatcher.edit(leaderboard_message, embed=error_embed)
             except:
                 pass
+    finally:
+        subscription.close()
 
 @bot.tree.command(name="chainboard", description="Show current chain leaderboard")
 @app_commands.guild_only()
 async def chainboard(interaction: discord.Interaction):
     await interaction.response.defer()
+    observe_interaction_ack(interaction)
     
-    chain_data = await get_chain_leaderboard()
-    if not chain_data:
+    snapshot = await get_chain_feed().get(max_age=CHAINBOARD_MAX_AGE, priority=PRIORITY_INTERACTIVE)
+    if not snapshot:
         await interaction.followup.send(
             "❌ Failed to retrieve chain data from Torn API.",
             ephemeral=True
         )
         return
     
-    leaderboard, current_hits, is_active = process_chain_data(chain_data)
-    embed = create_leaderboard_embed(leaderboard, current_hits)
-    
-    if not is_active:
-        embed.description = "⚠️ No active chain found."
-    
-    await interaction.followup.send(embed=embed)
+    view = LeaderboardView(snapshot)
+    if view.page_count > 1:
+        await interaction.followup.send(embed=view.render(), view=view)
+    else:
+        await interaction.followup.send(embed=view.render())
 
  
 
 async def check_chain_status_periodically(faction_id: str = "53180"):
     """Periodically checks for an active chain and sends a notification if one starts."""
     notification_sent_for_current_chain = False
+    seen_inactive = False  # detection latency is only meaningful if the chain started while we were watching
+    idle_polls = 0
+    subscription = get_chain_feed(faction_id).subscribe(get_chain_poll_interval(None))
+    bot.chain_status_subscription = subscription
+    watchdog = ChainTimeoutWatchdog(faction_id)
     
     while True:
-        await asyncio.sleep(600)  # Check every 10 minutes
-        
-        chain_data = await get_chain_leaderboard(faction_id)
-        if not chain_data:
-            continue
-            
-        is_active = chain_data.get("current", 0) > 0
+        snapshot = await subscription.next()
+        is_active = snapshot.is_active
+        watchdog.sync(snapshot)
+        idle_polls = 0 if is_active else idle_polls + 1
+        retune_chain_status_poll(idle_polls)
+        bot.chain_poll_stats.record_poll(subscription.interval)
         
         if is_active and not notification_sent_for_current_chain:
+            chain_start = snapshot.chain.get("start") or 0
+            if seen_inactive and chain_start:
+                latency = max(snapshot.fetched_at - chain_start, 0)
+                logger.info(f"Chain start detected {latency:.0f}s after it began, "
+                            f"after {bot.chain_poll_stats.polls_since_detection} status polls.")
+                bot.chain_poll_stats.record_detection(latency)
+                seen_inactive = False
+
             channel_id = bot.config.get("chain_notification_channel_id")
             if not channel_id:
-                logger.warning("Chain detected, but no notification channel is set.")
+                logger.warning("Chain detected, but no notification channel is set.", extra={"sample": "chain_no_channel"})
                 continue
                 
             channel = bot.get_channel(channel_id)
             if not channel:
-                logger.error(f"Could not find notification channel with ID {channel_id}.")
+                logger.error(f"Could not find notification channel with ID {channel_id}.", extra={"sample": "chain_missing_channel"})
                 continue
             
             embed = discord.Embed(
@@ -1137,6 +2894,7 @@ async def check_chain_status_periodically(faction_id: str = "53180"):
                 
         elif not is_active:
             notification_sent_for_current_chain = False
+            seen_inactive = True
             
 @bot.tree.command(name="show-config", description="Display the current bot configuration.")
 @app_commands.guild_only()
@@ -1144,6 +2902,7 @@ async def check_chain_status_periodically(faction_id: str = "53180"):
 async def show_config(interaction: discord.Interaction):
     """Shows the current bot configuration."""
     await interaction.response.defer(ephemeral=True)
+    observe_interaction_ack(interaction)
     
     chain_channel_id = bot.config.get("chain_notification_channel_id")
     
@@ -1163,208 +2922,707 @@ async def show_config(interaction: discord.Interaction):
     
     await interaction.followup.send(embed=embed, ephemeral=True)
 
-async def sync_faction_roles_periodically():
+@bot.tree.command(name="chain-schedule", description="Show the pending chain deadlines.")
+@app_commands.guild_only()
+@app_commands.checks.has_permissions(administrator=True)
+async def chain_schedule(interaction: discord.Interaction):
+    """Shows the scheduler's queue of pending deadlines."""
+    pending = bot.scheduler.pending()
+
+    embed = discord.Embed(
+        title="Scheduled Deadlines",
+        description=f"{len(pending)} pending" if pending else "Nothing scheduled.",
+        color=discord.Color.blue()
+    )
+    lines = [f"<t:{int(deadline.when)}:T> (<t:{int(deadline.when)}:R>) • {deadline.name}" for deadline in pending[:20]]
+    if lines:
+        embed.add_field(name="Next Deadlines", value="\n".join(lines), inline=False)
+    edit_stats = bot.edit_dispatcher.stats()
+    embed.add_field(
+        name="Message Edit Queue",
+        value=f"Queued: `{edit_stats['queue_depth']}` • In flight: `{edit_stats['in_flight']}`\n" +
+              f"Sent: `{edit_stats['sent']}` • Dropped (superseded): `{edit_stats['dropped']}` • Failed: `{edit_stats['failed']}`",
+        inline=False
+    )
+    write_stats = bot.chain_writer.stats()
+    embed.add_field(
+        name="Chain Persistence",
+        value=f"Pending: `{write_stats['pending']}` • Requested: `{write_stats['requested']}` • Written: `{write_stats['written']}` "
+              f"in `{write_stats['flushes']}` flushes\n" +
+              f"Coalesced: `{write_stats['coalesced']}` • Discarded (chain removed): `{write_stats['discarded']}`",
+        inline=False
+    )
+    poll_stats = bot.chain_poll_stats.stats()
+    latency_text = (f"Median detection latency: `{poll_stats['median_latency']:.0f}s` (max `{poll_stats['max_latency']:.0f}s`) • "
+                    f"Polls per detection: `{poll_stats['polls_per_detection']:.1f}`"
+                    if poll_stats["detections"] else "No chain starts detected yet.")
+    embed.add_field(
+        name="Chain Status Polling",
+        value=f"Interval: `{poll_stats['interval']:.0f}s` • Polls: `{poll_stats['polls']}` (`{poll_stats['polls_per_hour']:.1f}`/h)\n" + latency_text,
+        inline=False
+    )
+    if len(pending) > 20:
+        embed.set_footer(text=f"Showing the next 20 of {len(pending)} deadlines")
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+    observe_interaction_ack(interaction)
+
+@bot.tree.command(name="perf", description="Show what blocked the event loop the longest since startup.")
+@app_commands.guild_only()
+@app_commands.checks.has_permissions(administrator=True)
+async def perf(interaction: discord.Interaction):
+    """Shows event loop lag statistics and the worst blocking call sites."""
+    monitor = bot.lag_monitor
+    if monitor is None:
+        await interaction.response.send_message(
+            "The event loop lag monitor is disabled. Set `LAG_MONITOR=1` to enable it.", ephemeral=True
+        )
+        observe_interaction_ack(interaction)
+        return
+
+    mean_lag = monitor.total_lag / monitor.samples if monitor.samples else 0
+    embed = discord.Embed(
+        title="Event Loop Performance",
+        description=f"Since <t:{int(monitor.started_at)}:R> • Threshold: `{monitor.threshold * 1000:.0f}ms`\n" +
+                    f"Mean lag: `{mean_lag * 1000:.1f}ms` • Max lag: `{monitor.max_lag * 1000:.0f}ms` • Stalls: `{monitor.stalls}`",
+        color=discord.Color.blue()
+    )
+    for location, offender in monitor.worst_offenders():
+        summary = (f"Worst: `{offender['worst'] * 1000:.0f}ms` • Count: `{offender['count']}` • " +
+                   f"Total: `{offender['total'] * 1000:.0f}ms`\n")
+        stack = f"```\n{offender['stack'][-(EMBED_FIELD_LIMIT - len(summary) - 8):]}```" if offender["stack"] else ""
+        embed.add_field(name=location[:256], value=summary + stack, inline=False)
+    if not monitor.offenders:
+        embed.add_field(name="Worst Offenders", value="No stalls recorded.", inline=False)
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+    observe_interaction_ack(interaction)
+
+async def resolve_user_factions(torn_ids: Set[str]) -> Dict[str, Tuple[Optional[int], bool]]:
     """
-    Periodically synchronizes faction roles for all members in all servers the bot is in.
-    Runs every 30 minutes.
+    Looks up the faction of many Torn users concurrently.
+    Concurrency grows with the size of the key pool, so throughput scales with the number of keys.
+    Returns {torn_id: (faction_id, api_success)}
     """
-    await bot.wait_until_ready()
-    while not bot.is_closed():
-        logger.info("Starting periodic faction role synchronization...")
-        
-        faction_map = {
-            53180: "faction -I-",
-            55332: "faction -II-"
+    semaphore = asyncio.Semaphore(len(bot.torn.scheduler.slots) * TORN_SYNC_LOOKUPS_PER_KEY)
+
+    async def lookup(torn_id: str):
+        async with semaphore:
+            return torn_id, await get_user_faction(torn_id)
+
+    results = await asyncio.gather(*(lookup(torn_id) for torn_id in torn_ids))
+    return dict(results)
+
+async def get_faction_roster(faction_id: int) -> Optional[Set[str]]:
+    """
+    Gets the Torn IDs of every member of a faction.
+    Returns None if the API call failed.
+    """
+    try:
+        data = await bot.torn.get_faction_basic(str(faction_id))
+        if data is None:
+            return None
+
+        if 'error' in data:
+            logger.error(f"Faction roster API error for {faction_id}: {data['error']['error']}")
+            return None
+
+        return set(data.get("members", {}).keys())
+
+    except Exception as e:
+        logger.error(f"Error getting faction roster for {faction_id}: {e}")
+        return None
+
+async def build_faction_index() -> Optional[Dict[str, int]]:
+    """
+    Builds a Torn ID -> faction ID index from the rosters of all tracked factions.
+    Returns None if any roster could not be fetched, so roles are never removed because of an API error.
+    """
+    faction_ids = list(FACTION_ROLES)
+    rosters = await asyncio.gather(*(get_faction_roster(faction_id) for faction_id in faction_ids))
+
+    faction_index = {}
+    for faction_id, roster in zip(faction_ids, rosters):
+        if roster is None:
+            return None
+        for torn_id in roster:
+            faction_index[torn_id] = faction_id
+    return faction_index
+
+def parse_torn_id(nick: Optional[str]) -> Optional[str]:
+    """Extracts the Torn ID from a nickname in the format 'name [ID]'."""
+    if not nick:
+        return None
+    match = TORN_ID_PATTERN.search(nick)
+    return match.group(1) if match else None
+
+def mark_member_dirty(member: discord.Member):
+    """Queues a member for the next incremental faction role reconciliation."""
+    if member.bot:
+        return
+    bot.dirty_members.add((member.guild.id, member.id))
+    bot.dirty_members_event.set()
+
+def mark_torn_ids_dirty(torn_ids: Set[str]):
+    """Queues every member linked to one of the given Torn IDs."""
+    for guild in bot.guilds:
+        index = get_nickname_index(guild)
+        for torn_id in torn_ids:
+            for member_id in index.members_for_torn_id(torn_id):
+                member = guild.get_member(member_id)
+                if member:
+                    mark_member_dirty(member)
+
+async def refresh_faction_index() -> Optional[Dict[str, int]]:
+    """
+    Fetches fresh faction rosters and stores the index on the bot.
+    Members whose Torn faction changed since the previous index are queued for reconciliation.
+    """
+    faction_index = await build_faction_index()
+    if faction_index is None:
+        return None
+
+    previous_index = bot.faction_index
+    bot.faction_index = faction_index
+    bot.faction_departures -= faction_index.keys()
+    if previous_index is not None:
+        bot.faction_departures |= previous_index.keys() - faction_index.keys()
+        changed_ids = {
+            torn_id for torn_id in previous_index.keys() | faction_index.keys()
+            if previous_index.get(torn_id) != faction_index.get(torn_id)
         }
-        
-        id_pattern = re.compile(r'\[(\d+)\]$')
+        if changed_ids:
+            logger.info(f"Faction membership changed for {len(changed_ids)} Torn IDs.")
+            mark_torn_ids_dirty(changed_ids)
+    return faction_index
 
-        for guild in bot.guilds:
-            logger.info(f"Syncing roles for guild: {guild.name} ({guild.id})")
-            
-            role_i = discord.utils.get(guild.roles, name="faction -I-")
-            role_ii = discord.utils.get(guild.roles, name="faction -II-")
+async def lookup_factions(torn_ids: Set[str], use_cached_index: bool = False) -> Optional[Dict[str, Tuple[Optional[int], bool]]]:
+    """
+    Resolves Torn IDs to factions using the configured sync mode.
+    Returns {torn_id: (faction_id, api_success)}, or None if the rosters could not be fetched.
+    """
+    if FACTION_SYNC_MODE == "roster":
+        # Two roster requests cover every member, however many there are
+        if use_cached_index and bot.faction_index is not None:
+            # The cached rosters may predate a new recruit, so an ID missing from them only counts as factionless
+            # once it was seen leaving a roster; anything else is left for the next full sync with fresh rosters
+            return {
+                torn_id: (bot.faction_index.get(torn_id), torn_id in bot.faction_index or torn_id in bot.faction_departures)
+                for torn_id in torn_ids
+            }
+        faction_index = await refresh_faction_index()
+        if faction_index is None:
+            return None
+        return {torn_id: (faction_index.get(torn_id), True) for torn_id in torn_ids}
+
+    # Look up every linked Torn ID once, spread over the key pool
+    return await resolve_user_factions(torn_ids)
+
+def get_faction_role_objects(guild: discord.Guild) -> Optional[Tuple[discord.Role, discord.Role]]:
+    """Returns the guild's ('faction -I-', 'faction -II-') roles, or None if either is missing."""
+    role_i = discord.utils.get(guild.roles, name="faction -I-")
+    role_ii = discord.utils.get(guild.roles, name="faction -II-")
+    if not role_i or not role_ii:
+        return None
+    return role_i, role_ii
 
-            if not role_i or not role_ii:
-                logger.warning(f"Skipping guild {guild.name} because faction roles ('faction -I-', 'faction -II-') were not found.")
-                continue
+def plan_member_faction_roles(member: discord.Member, faction_lookup: Dict[str, Tuple[Optional[int], bool]],
+                              role_i: discord.Role, role_ii: discord.Role) -> Optional[Dict[discord.Role, bool]]:
+    """
+    Works out which faction roles the member should hold, as {role: wanted}.
+    Returns None if nothing needs to change (or the member's faction is unknown).
+    """
+    torn_id = parse_torn_id(member.nick)
+    if member.bot or not torn_id:
+        return None
 
-            updated_members = 0
-            
-            for member in guild.members:
-                if member.bot or not member.nick:
-                    continue
-                    
-                match = id_pattern.search(member.nick)
-                if not match:
-                    continue
-                
-                torn_id = match.group(1)
-                faction_id, api_success = await get_user_faction(torn_id)
-                
-                # Skip if API call failed (don't remove roles due to temporary API errors)
-                if not api_success:
-                    continue
-                
-                await asyncio.sleep(0.6) # API rate limit
+    faction_id, api_success = faction_lookup.get(torn_id, (None, False))
 
-                target_role_name = faction_map.get(faction_id) if faction_id else None
-                roles_changed = False
-                
+    # Skip if API call failed (don't remove roles due to temporary API errors)
+    if not api_success:
+        return None
+
+    target_role_name = FACTION_ROLES.get(faction_id) if faction_id else None
+    wanted = {
+        role_i: target_role_name == "faction -I-",
+        role_ii: target_role_name == "faction -II-"
+    }
+
+    if faction_roles_for(member, wanted) is None:
+        return None
+    return wanted
+
+def faction_roles_for(member: discord.Member, wanted: Dict[discord.Role, bool]) -> Optional[List[discord.Role]]:
+    """
+    Returns the member's complete role list with the wanted faction roles applied to their current roles,
+    or None if they already match.
+    """
+    current_roles = [role for role in member.roles if not role.is_default()]
+    if all((role in current_roles) == keep for role, keep in wanted.items()):
+        return None
+
+    final_roles = [role for role in current_roles if role not in wanted]
+    final_roles.extend(role for role, keep in wanted.items() if keep)
+    return final_roles
+
+def record_sync_pass_metrics(kind: str, duration: float, report: "RoleSyncReport"):
+    """Exports one sync pass (full or incremental) to the metrics endpoint."""
+    metrics.observe("faction_sync_duration_seconds", duration, {"pass": kind})
+    metrics.set("faction_sync_members_processed", report.checked, {"pass": kind})
+    metrics.inc("faction_sync_members_processed_total", {"pass": kind}, report.checked)
+
+class RoleSyncReport:
+    """Counts what a role sync pass planned and did."""
+    def __init__(self):
+        self.checked = 0
+        self.planned = 0
+        self.executed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def __str__(self):
+        return f"checked={self.checked} planned={self.planned} executed={self.executed} skipped={self.skipped} failed={self.failed}"
+
+def plan_guild_faction_roles(guild: discord.Guild, members, faction_lookup: Dict[str, Tuple[Optional[int], bool]],
+                             report: RoleSyncReport) -> List[Tuple[discord.Member, Dict[discord.Role, bool]]]:
+    """Plans the role edits needed for the given members of one guild."""
+    roles = get_faction_role_objects(guild)
+    if not roles:
+        logger.warning(f"Skipping guild {guild.name} because faction roles ('faction -I-', 'faction -II-') were not found.")
+        return []
+
+    plans = []
+    for member in members:
+        if member.bot or not parse_torn_id(member.nick):
+            continue
+        report.checked += 1
+        wanted = plan_member_faction_roles(member, faction_lookup, *roles)
+        if wanted is None:
+            report.skipped += 1
+        else:
+            plans.append((member, wanted))
+    report.planned += len(plans)
+    return plans
+
+async def execute_role_plans(plans: List[Tuple[discord.Member, Dict[discord.Role, bool]]], report: RoleSyncReport):
+    """
+    Applies planned faction roles with one member.edit call per member.
+    Guilds are processed concurrently with at most ROLE_EDIT_CONCURRENCY edits in flight overall.
+    Edits within a guild run one at a time since member edits share the guild's rate-limit bucket.
+    The role list is rebuilt from the member's roles right before each edit, since a pass can take minutes
+    and a role list from planning time would revert changes made meanwhile (/setnick, admins).
+    """
+    plans_by_guild: Dict[int, List[Tuple[discord.Member, Dict[discord.Role, bool]]]] = {}
+    for member, wanted in plans:
+        plans_by_guild.setdefault(member.guild.id, []).append((member, wanted))
+
+    semaphore = asyncio.Semaphore(ROLE_EDIT_CONCURRENCY)
+
+    async def run_guild(guild_plans):
+        for member, wanted in guild_plans:
+            async with semaphore:
+                member = member.guild.get_member(member.id) or member
+                final_roles = faction_roles_for(member, wanted)
+                if final_roles is None:  # already right, e.g. /setnick got there first
+                    report.skipped += 1
+                    continue
                 try:
-                    if target_role_name == "faction -I-":
-                        if role_ii in member.roles:
-                            await member.remove_roles(role_ii, reason="Auto faction sync")
-                            roles_changed = True
-                        if role_i not in member.roles:
-                            await member.add_roles(role_i, reason="Auto faction sync")
-                            roles_changed = True
-                    
-                    elif target_role_name == "faction -II-":
-                        if role_i in member.roles:
-                            await member.remove_roles(role_i, reason="Auto faction sync")
-                            roles_changed = True
-                        if role_ii not in member.roles:
-                            await member.add_roles(role_ii, reason="Auto faction sync")
-                            roles_changed = True
-                    
-                    else: # Not in either faction (faction_id is None but API call succeeded)
-                        if role_i in member.roles:
-                            await member.remove_roles(role_i, reason="Auto faction sync")
-                            roles_changed = True
-                        if role_ii in member.roles:
-                            await member.remove_roles(role_ii, reason="Auto faction sync")
-                            roles_changed = True
-
-                    if roles_changed:
-                        updated_members += 1
-                        logger.info(f"Updated roles for {member.display_name} ({member.id}) in {guild.name}.")
-                        
+                    await member.edit(roles=final_roles, reason="Auto faction sync")
+                    report.executed += 1
+                    logger.info(f"Updated roles for {member.display_name} ({member.id}) in {member.guild.name}.", extra={"sample": "role_update"})
                 except discord.Forbidden:
-                    logger.error(f"Permission error updating roles for {member.display_name} in {guild.name}.")
+                    report.failed += 1
+                    logger.error(f"Permission error updating roles for {member.display_name} in {member.guild.name}.", extra={"sample": "role_update_forbidden"})
                 except Exception as e:
+                    report.failed += 1
                     logger.error(f"An unexpected error occurred while updating roles for {member.display_name}: {e}")
 
-            logger.info(f"Faction role sync complete for {guild.name}. Updated {updated_members} members.")
+    await asyncio.gather(*(run_guild(guild_plans) for guild_plans in plans_by_guild.values()))
 
-        await asyncio.sleep(1800) # Wait 30 minutes
+async def reconcile_dirty_members_periodically():
+    """
+    Reconciles the faction roles of members queued by member events or faction changes.
+    Only queued members are looked at, so API and Discord traffic follow what actually changed.
+    """
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        await bot.dirty_members_event.wait()
+        await asyncio.sleep(DIRTY_MEMBER_DEBOUNCE)  # let bursts of events collapse into one batch
+        bot.dirty_members_event.clear()
+        dirty_members, bot.dirty_members = bot.dirty_members, set()
+
+        members = []
+        for guild_id, member_id in dirty_members:
+            guild = bot.get_guild(guild_id)
+            member = guild.get_member(member_id) if guild else None
+            if member and parse_torn_id(member.nick):
+                members.append(member)
+        if not members:
+            continue
+
+        faction_lookup = await lookup_factions({parse_torn_id(member.nick) for member in members}, use_cached_index=True)
+        if faction_lookup is None:
+            logger.warning(f"Could not resolve factions, re-queuing {len(members)} members.")
+            bot.dirty_members |= dirty_members
+            await asyncio.sleep(FACTION_ROSTER_REFRESH_INTERVAL)
+            bot.dirty_members_event.set()
+            continue
+
+        started = time.monotonic()
+        report = RoleSyncReport()
+        members_by_guild: Dict[int, List[discord.Member]] = {}
+        for member in members:
+            members_by_guild.setdefault(member.guild.id, []).append(member)
+        plans = []
+        for guild_members in members_by_guild.values():
+            plans.extend(plan_guild_faction_roles(guild_members[0].guild, guild_members, faction_lookup, report))
+        await execute_role_plans(plans, report)
+        logger.info(f"Reconciled faction roles for {len(members)} changed members ({report}).")
+        record_sync_pass_metrics("incremental", time.monotonic() - started, report)
+
+async def refresh_faction_rosters_periodically():
+    """Polls the faction rosters so members who join or leave a faction in Torn are reconciled promptly."""
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        await asyncio.sleep(FACTION_ROSTER_REFRESH_INTERVAL)
+        if await refresh_faction_index() is None:
+            logger.warning("Could not refresh faction rosters.")
+
+async def run_faction_role_sync(guilds) -> Optional[RoleSyncReport]:
+    """
+    Runs one full faction role sync pass over the given guilds.
+    Returns the pass report, or None if the faction lookups failed and nothing was changed.
+    """
+    torn_ids = set()
+    for guild in guilds:
+        for member in guild.members:
+            torn_id = parse_torn_id(member.nick)
+            if torn_id and not member.bot:
+                torn_ids.add(torn_id)
+
+    faction_lookup = await lookup_factions(torn_ids)
+    if faction_lookup is None:
+        return None
+
+    # Plan every guild first, then apply only the edits that are actually needed
+    started = time.monotonic()
+    report = RoleSyncReport()
+    plans = []
+    for guild in guilds:
+        plans.extend(plan_guild_faction_roles(guild, guild.members, faction_lookup, report))
+    await execute_role_plans(plans, report)
+
+    duration = time.monotonic() - started
+    logger.info(f"Faction role sync complete for {len(guilds)} guilds in {duration:.1f}s ({report}).")
+    record_sync_pass_metrics("full", duration, report)
+    return report
+
+async def sync_faction_roles_periodically():
+    """
+    Periodically synchronizes faction roles for all members in all servers the bot is in.
+    Day to day changes are handled incrementally, so this full sweep is a consistency check
+    that runs every FACTION_SYNC_INTERVAL seconds (6 hours in roster mode, 30 minutes in profile mode).
+    """
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        logger.info(f"Starting periodic faction role synchronization ({FACTION_SYNC_MODE} mode)...")
+
+        if await run_faction_role_sync(bot.guilds) is None:
+            logger.warning("Could not fetch faction rosters, skipping this faction role sync.")
+            await asyncio.sleep(FACTION_ROSTER_REFRESH_INTERVAL)
+            continue
+
+        await asyncio.sleep(FACTION_SYNC_INTERVAL)
 
 async def get_ranked_war_data(faction_id: str = "53180") -> Optional[Dict]:
     """Get ranked war data from Torn API."""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://api.torn.com/faction/{faction_id}?selections=rankedwars&key={torn_api_key}"
-            logger.info(f"Making API request to: {url[:80]}...")  # Don't log the full API key
-            async with session.get(url) as response:
-                logger.info(f"API response status: {response.status}")
-                if response.status != 200:
-                    logger.error(f"Ranked war API request failed with status {response.status}")
-                    return None
-                data = await response.json()
-                logger.info(f"Raw API response: {json.dumps(data, indent=2)}")
-                if 'error' in data:
-                    logger.error(f"Ranked war API Error: {data['error']['error']}")
-                    return None
-                wars = data.get("rankedwars", {})
-                logger.info(f"Found {len(wars)} ranked wars in API response")
-                return wars
+        data = await bot.torn.get_faction_ranked_wars(faction_id)
+        if data is None:
+            logger.error("Ranked war API request failed")
+            return None
+        if TORN_DEBUG_PAYLOADS and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Raw ranked war API response: {json.dumps(data, indent=2)}")
+        if 'error' in data:
+            logger.error(f"Ranked war API Error: {data['error']['error']}")
+            return None
+        wars = data.get("rankedwars", {})
+        logger.debug(f"Found {len(wars)} ranked wars in API response")
+        return wars
     except Exception as e:
         logger.error(f"Ranked war data error: {e}")
         return None
 
+async def announce_ranked_wars(war_data: Dict, faction_id: str = "53180") -> bool:
+    """
+    Announces every upcoming ranked war that wasn't announced yet and forgets wars that have ended.
+    Returns whether every upcoming war is now announced.
+    """
+    all_announced = True
+    relevant_war_ids = set()
+
+    for war_id, war in war_data.items():
+        war_details = war.get('war', {})
+        war_start_timestamp = war_details.get('start', 0)
+        war_end_timestamp = war_details.get('end', 0)
+        current_timestamp = datetime.now(timezone.utc).timestamp()
+
+        logger.debug(f"Processing War ID: {war_id} | Start: {war_start_timestamp} | End: {war_end_timestamp}")
+
+        # A war is relevant if it hasn't ended yet (Torn reports an end of 0 until it has).
+        if not war_end_timestamp or war_end_timestamp > current_timestamp:
+            relevant_war_ids.add(war_id)
+
+            # Announce if it's an UPCOMING war that hasn't been announced yet.
+            if war_start_timestamp > current_timestamp:
+                if war_id not in bot.announced_war_ids:
+                    logger.info(f"Found new UPCOMING war: {war_id}. Announcing...")
+                    
+                    channel_id = bot.config.get("war_notification_channel_id")
+                    if not channel_id:
+                        logger.warning(f"Upcoming war {war_id} detected, but no notification channel is set.", extra={"sample": "war_no_channel"})
+                        all_announced = False
+                        continue
+
+                    channel = bot.get_channel(channel_id)
+                    if not channel:
+                        logger.error(f"Could not find war notification channel with ID {channel_id}.", extra={"sample": "war_missing_channel"})
+                        all_announced = False
+                        continue
+
+                    start_time_utc = datetime.fromtimestamp(war_start_timestamp, tz=timezone.utc)
+                    seconds_until_start = max(0, (start_time_utc - datetime.now(timezone.utc)).total_seconds())
+
+                    embed = discord.Embed(
+                        title="⚔️ Upcoming Ranked War! ⚔️",
+                        description="A new ranked war is on the horizon! Prepare for battle!",
+                        color=discord.Color.orange()
+                    )
+                    embed.set_image(url="https://tenor.com/view/lets-go-charge-attack-battle-war-gif-21250118")
+                    
+                    factions = war.get('factions', {})
+                    enemy_faction_name = "Unknown Faction"
+                    for f_id, f_details in factions.items():
+                        if f_id != faction_id:
+                            enemy_faction_name = f_details.get('name', 'Unknown Faction')
+                            break
+                    
+                    embed.add_field(name="Opponent", value=enemy_faction_name, inline=False)
+                    embed.add_field(
+                        name="War Starts In",
+                        value=f"Countdown: {format_time_remaining(int(seconds_until_start))}\n" +
+                              f"Start Time: <t:{int(start_time_utc.timestamp())}:F>",
+                        inline=False
+                    )
+                    
+                    chain_data = {'organizer': 'Auto-Announced'}
+                    view = ChainView(bot, chain_data)
+
+                    try:
+                        await channel.send(embed=embed, view=view)
+                        bot.announced_war_ids.add(war_id)
+                        await bot.chain_store.add_announced_war(war_id)
+                        logger.info(f"Successfully announced upcoming war {war_id} in channel {channel_id}.")
+                    except Exception as e:
+                        all_announced = False
+                        logger.error(f"Failed to send war announcement for war {war_id}: {e}", exc_info=True)
+                else:
+                    logger.debug(f"Upcoming war {war_id} has already been announced.")
+            else:
+                logger.debug(f"War {war_id} is already active, not announcing as 'upcoming'.")
+        else:
+            logger.debug(f"War {war_id} has already ended.")
+
+    # Clean up announced_war_ids for wars that are no longer relevant.
+    obsolete_ids = bot.announced_war_ids - relevant_war_ids
+    if obsolete_ids:
+        logger.info(f"Clearing obsolete war IDs from announced set: {obsolete_ids}")
+        bot.announced_war_ids -= obsolete_ids
+        await bot.chain_store.remove_announced_wars(obsolete_ids)
+
+    return all_announced
+
+def find_current_war(war_data: Dict) -> Optional[Tuple[str, Dict]]:
+    """
+    Picks the war the scoreboard should show: the running one, otherwise the next upcoming one.
+    Returns (war_id, war) or None
+    """
+    now = time.time()
+    upcoming = None
+    for war_id, war in war_data.items():
+        start = war.get('war', {}).get('start', 0)
+        end = war.get('war', {}).get('end', 0)
+        if end and end <= now:
+            continue
+        if start <= now:
+            return war_id, war
+        if upcoming is None or start < upcoming[1]['war']['start']:
+            upcoming = (war_id, war)
+    return upcoming
+
+class WarBoard:
+    """
+    Live scoreboard for the faction's ranked war, kept in one pinned message.
+    Scores come from the ranked war monitor's poll and member contributions are folded in from
+    the chain feed's new hits, so neither needs a request loop of its own.
+    """
+    def __init__(self, faction_id: str):
+        self.faction_id = faction_id
+        self.war_data: Optional[Dict] = None  # latest rankedwars payload
+        self.war_id: Optional[str] = None
+        self.war_start = 0
+        self.enemy_faction_id: Optional[str] = None
+        self.contributions: Dict[str, Dict[str, float]] = {}
+        self.rendered_score: Optional[Tuple] = None
+
+    def fold_hits(self, new_hits: List[Dict]):
+        """Adds chain hits on the enemy faction made during the current war to the member contributions."""
+        if not self.war_id or not self.war_start or self.war_start > time.time():
+            return
+        for hit in new_hits:
+            if get_hit_timestamp(hit) < self.war_start:
+                continue
+            defender_faction = hit.get("defender_faction")
+            if defender_faction and self.enemy_faction_id and str(defender_faction) != self.enemy_faction_id:
+                continue  # a chain hit outside the war
+            attacker = hit.get("initiator_name", "Unknown")
+            stats = self.contributions.get(attacker)
+            if stats is None:
+                stats = self.contributions[attacker] = {"hits": 0, "respect": 0.0}
+            stats["hits"] += 1
+            stats["respect"] += float(hit.get("respect_gain") or 0)
+
+    def score_key(self, war_id: Optional[str], war: Optional[Dict]) -> Tuple:
+        """Everything the board shows that comes from the rankedwars payload."""
+        if war is None:
+            return (None,)
+        details = war.get('war', {})
+        scores = tuple(sorted((f_id, f.get('score', 0)) for f_id, f in war.get('factions', {}).items()))
+        return (war_id, details.get('start', 0) <= time.time(), details.get('target', 0), scores)
+
+    def build_embed(self, war_id: Optional[str], war: Optional[Dict]) -> discord.Embed:
+        embed = discord.Embed(title="⚔️ Ranked War Scoreboard", color=discord.Color.dark_red(), timestamp=datetime.now(timezone.utc))
+        if war is None:
+            embed.description = "No ranked war in progress or scheduled."
+            return embed
+
+        details = war.get('war', {})
+        factions = war.get('factions', {})
+        ours = factions.get(self.faction_id, {})
+        enemy = next((f for f_id, f in factions.items() if f_id != self.faction_id), {})
+        our_name, enemy_name = ours.get('name', 'Us'), enemy.get('name', 'Unknown Faction')
+        start = details.get('start', 0)
+        embed.title = f"⚔️ {our_name} vs {enemy_name}"
+
+        if start > time.time():
+            embed.description = f"War starts <t:{start}:R> (<t:{start}:F>)"
+            return embed
+
+        our_score, enemy_score = ours.get('score', 0), enemy.get('score', 0)
+        lead = our_score - enemy_score
+        target = details.get('target', 0)
+        leader = our_name if lead >= 0 else enemy_name
+        embed.color = discord.Color.green() if lead >= 0 else discord.Color.red()
+        embed.description = f"Started <t:{start}:R>"
+        embed.add_field(name="Score", value=f"**{our_name}** `{our_score}` — `{enemy_score}` **{enemy_name}**", inline=False)
+        embed.add_field(name="Lead", value=f"{leader} by `{abs(lead)}`", inline=True)
+        if target:
+            embed.add_field(name="Target", value=f"`{target}` • `{max(target - abs(lead), 0)}` to go", inline=True)
+
+        top = heapq.nlargest(WARBOARD_TOP_CONTRIBUTORS, self.contributions.items(), key=lambda entry: entry[1]["respect"])
+        if top:
+            lines = [f"{i}. {name} — `{stats['hits']}` hits, `{stats['respect']:.2f}` respect"
+                     for i, (name, stats) in enumerate(top, start=1)]
+            embed.add_field(name="Top Contributors", value="\n".join(lines)[:EMBED_FIELD_LIMIT], inline=False)
+        return embed
+
+    async def update(self, war_data: Dict):
+        """Records a fresh payload and edits the pinned board, but only if the score changed."""
+        self.war_data = war_data
+        current = find_current_war(war_data)
+        war_id, war = current if current else (None, None)
+        if war_id != self.war_id:
+            self.war_id = war_id
+            self.contributions = {}
+        self.war_start = war.get('war', {}).get('start', 0) if war else 0
+        self.enemy_faction_id = next((str(f_id) for f_id in war.get('factions', {}) if str(f_id) != self.faction_id), None) if war else None
+
+        score_key = self.score_key(war_id, war)
+        if score_key == self.rendered_score:
+            return
+
+        channel = bot.get_channel(bot.config.get("warboard_channel_id") or 0)
+        message_id = bot.config.get("warboard_message_id")
+        if not isinstance(channel, (discord.TextChannel, discord.Thread)) or not message_id:
+            return
+
+        try:
+            await bot.edit_dispatcher.edit(channel.get_partial_message(message_id), embed=self.build_embed(war_id, war))
+            self.rendered_score = score_key
+        except discord.NotFound:
+            logger.warning("War scoreboard message was deleted, disabling the scoreboard.")
+            bot.config["warboard_channel_id"] = bot.config["warboard_message_id"] = None
+            await save_config()
+        except Exception as e:
+            logger.error(f"Failed to update the war scoreboard: {e}")
+
+def get_warboard(faction_id: str = "53180") -> WarBoard:
+    """Returns the war scoreboard, hooking it up to the chain feed the first time."""
+    if bot.warboard is None:
+        bot.warboard = WarBoard(faction_id)
+        get_chain_feed(faction_id).add_hit_listener(bot.warboard.fold_hits)
+    return bot.warboard
+
+@bot.tree.command(name="warboard", description="Post a live ranked war scoreboard in this channel and pin it.")
+@app_commands.guild_only()
+@app_commands.checks.has_permissions(manage_messages=True)
+async def warboard(interaction: discord.Interaction):
+    """Posts the war scoreboard here; the ranked war monitor keeps it up to date."""
+    board = get_warboard()
+    current = find_current_war(board.war_data) if board.war_data else None
+    embed = board.build_embed(*current) if current else board.build_embed(None, None)
+    if board.war_data is None:
+        embed.description = "Waiting for ranked war data..."
+
+    await interaction.response.send_message(embed=embed)
+    observe_interaction_ack(interaction)
+    message = await interaction.original_response()
+    try:
+        await message.pin()
+    except discord.HTTPException as e:
+        logger.warning(f"Could not pin the war scoreboard: {e}")
+
+    bot.config["warboard_channel_id"] = interaction.channel.id
+    bot.config["warboard_message_id"] = message.id
+    await save_config()
+    if board.war_data is not None:
+        board.rendered_score = board.score_key(*current) if current else (None,)
+
 async def check_ranked_war_status_periodically(faction_id: str = "53180"):
-    """Periodically checks for upcoming ranked wars and announces them."""
+    """
+    Periodically checks for upcoming ranked wars and announces them.
+    Responses identical to the last fully processed one are skipped after hashing; the scoreboard
+    is updated on every poll since a war starting changes it without changing the payload.
+    """
     logger.info(f"Starting ranked war monitoring for faction {faction_id}")
-    logger.info(f"Current configuration: {bot.config}")
+    bot.announced_war_ids = await bot.chain_store.load_announced_wars()
+    board = get_warboard(faction_id)
+    last_payload_hash = None
     
     while True:
-        await asyncio.sleep(60)  # Check every 1 minute
-        
-        logger.info("=== Checking for ranked wars ===")
         war_data = await get_ranked_war_data(faction_id)
-        if not war_data:
-            logger.info("No war data returned from API. This is normal if no wars are scheduled.")
-            pass
-
-        logger.info(f"Processing {len(war_data)} wars from API. Current announced IDs: {bot.announced_war_ids}")
-        
-        relevant_war_ids = set()
-
-        for war_id, war in war_data.items():
-            war_details = war.get('war', {})
-            war_start_timestamp = war_details.get('start', 0)
-            war_end_timestamp = war_details.get('end', 0)
-            current_timestamp = datetime.now(timezone.utc).timestamp()
-
-            logger.info(f"Processing War ID: {war_id} | Start: {datetime.fromtimestamp(war_start_timestamp, tz=timezone.utc)} | End: {datetime.fromtimestamp(war_end_timestamp, tz=timezone.utc)}")
-
-            # A war is relevant if it hasn't ended yet.
-            if war_end_timestamp > current_timestamp:
-                relevant_war_ids.add(war_id)
-
-                # Announce if it's an UPCOMING war that hasn't been announced yet.
-                if war_start_timestamp > current_timestamp:
-                    if war_id not in bot.announced_war_ids:
-                        logger.info(f"Found new UPCOMING war: {war_id}. Announcing...")
-                        
-                        channel_id = bot.config.get("war_notification_channel_id")
-                        if not channel_id:
-                            logger.warning(f"Upcoming war {war_id} detected, but no notification channel is set.")
-                            continue
-
-                        channel = bot.get_channel(channel_id)
-                        if not channel:
-                            logger.error(f"Could not find war notification channel with ID {channel_id}.")
-                            continue
-
-                        start_time_utc = datetime.fromtimestamp(war_start_timestamp, tz=timezone.utc)
-                        seconds_until_start = max(0, (start_time_utc - datetime.now(timezone.utc)).total_seconds())
-
-                        embed = discord.Embed(
-                            title="⚔️ Upcoming Ranked War! ⚔️",
-                            description="A new ranked war is on the horizon! Prepare for battle!",
-                            color=discord.Color.orange()
-                        )
-                        embed.set_image(url="https://tenor.com/view/lets-go-charge-attack-battle-war-gif-21250118")
-                        
-                        factions = war.get('factions', {})
-                        enemy_faction_name = "Unknown Faction"
-                        for f_id, f_details in factions.items():
-                            if f_id != faction_id:
-                                enemy_faction_name = f_details.get('name', 'Unknown Faction')
-                                break
-                        
-                        embed.add_field(name="Opponent", value=enemy_faction_name, inline=False)
-                        embed.add_field(
-                            name="War Starts In",
-                            value=f"Countdown: {format_time_remaining(int(seconds_until_start))}\n" +
-                                  f"Start Time: <t:{int(start_time_utc.timestamp())}:F>",
-                            inline=False
-                        )
-                        
-                        chain_data = {'organizer': 'Auto-Announced'}
-                        view = ChainView(bot, chain_data)
-
-                        try:
-                            await channel.send(embed=embed, view=view)
-                            bot.announced_war_ids.add(war_id)
-                            logger.info(f"Successfully announced upcoming war {war_id} in channel {channel_id}.")
-                        except Exception as e:
-                            logger.error(f"Failed to send war announcement for war {war_id}: {e}", exc_info=True)
-                    else:
-                        logger.info(f"Upcoming war {war_id} has already been announced.")
-                else:
-                    logger.info(f"War {war_id} is already active, not announcing as 'upcoming'.")
-            else:
-                logger.info(f"War {war_id} has already ended.")
-
-        # Clean up announced_war_ids for wars that are no longer relevant.
-        obsolete_ids = bot.announced_war_ids - relevant_war_ids
-        if obsolete_ids:
-            logger.info(f"Clearing obsolete war IDs from announced set: {obsolete_ids}")
-            bot.announced_war_ids -= obsolete_ids
+        if war_data is not None:
+            await board.update(war_data)  # only edits the board when what it shows changed
+            payload_hash = hashlib.sha1(json.dumps(war_data, sort_keys=True).encode()).hexdigest()
+            if payload_hash != last_payload_hash:
+                logger.info(f"Ranked wars changed, processing {len(war_data)} wars. Announced IDs: {bot.announced_war_ids}")
+                # Only remember the payload once it was fully handled, so failed announcements are retried
+                if await announce_ranked_wars(war_data, faction_id):
+                    last_payload_hash = payload_hash
 
+        await asyncio.sleep(RANKED_WAR_POLL_INTERVAL)  # Check every 1 minute
 
 
 
-bot.run(token, log_level=logging.INFO)
\ No newline at end of file
+if __name__ == "__main__":
+    bot.run(token, log_handler=None)  # logging is already configured above
\ No newline at end of file